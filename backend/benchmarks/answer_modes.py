@@ -0,0 +1,102 @@
+"""Benchmark /ask latency with and without the follow-up summarization call (ANSWER_MODE).
+
+    python -m benchmarks.answer_modes --queries 20 --answer-words 300 --token-ms 5
+
+Each mode runs the real /ask endpoint in a fresh interpreter, since ANSWER_MODE
+and the token limits are read at import. Embeddings and completions come from
+the local fake OpenAI server, which sleeps --token-ms per generated token, so
+longer answers and the second call cost what they would against the API. The
+fake model ignores length instructions: concise answers are only as short as
+ANSWER_MAX_TOKENS makes them, an upper bound on the real ones.
+
+Modes:
+- summarize: full-length answer, then summarization (memo disabled)
+- summarize-memo: as above with every summary served from the answer-hash memo
+- concise: one length-budgeted completion
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_openai import FakeOpenAIServer
+from benchmarks.index_load import build_synthetic_index
+from benchmarks.retrieval_engine import summarize
+
+MODES = {
+    "summarize": {"ANSWER_MODE": "summarize", "SUMMARY_CACHE_SIZE": "0"},
+    "summarize-memo": {"ANSWER_MODE": "summarize"},
+    "concise": {"ANSWER_MODE": "concise"},
+}
+
+
+def run_worker(index_path: str, queries: int):
+    """Ask `queries` questions through /ask and print per-request latencies as JSON."""
+    from fastapi.testclient import TestClient
+    from langchain_openai import OpenAIEmbeddings
+
+    from chatbot import index_manager, main
+    from chatbot.http_clients import openai_client_kwargs
+
+    index_manager.find_index_path = lambda: index_path
+    # Skip tiktoken's length check; the fake server accepts raw strings
+    main.index_manager.embeddings_factory = lambda: OpenAIEmbeddings(check_embedding_ctx_length=False,
+                                                                     **openai_client_kwargs())
+    samples, answer_words = [], []
+    # One event loop for all requests, so the pooled async HTTP client keeps its connections
+    with TestClient(main.app) as client:
+        client.post("/ask", json={"question": "Tell me about your experience"})
+        for i in range(queries):
+            start = time.perf_counter()
+            response = client.post("/ask", json={"question": f"Tell me about your experience with project {i}"})
+            samples.append((time.perf_counter() - start) * 1000)
+            answer_words.append(len(response.json()["answer"].split()))
+    print(json.dumps({"samples": samples, "answer_words": answer_words}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/ask latency with and without summarization")
+    parser.add_argument("--docs", type=int, default=200, help="Chunks in the synthetic index")
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--answer-words", type=int, default=300, help="Length of an unconstrained answer")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Fake API time to first token")
+    parser.add_argument("--token-ms", type=float, default=5, help="Fake API time per generated token")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.queries)
+        return
+
+    server = FakeOpenAIServer(dimensions=args.dimensions, latency_ms=args.latency_ms,
+                              answer_words=args.answer_words, token_ms=args.token_ms)
+    base_url = server.start()
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    with tempfile.TemporaryDirectory() as path:
+        build_synthetic_index(path, args.docs, args.dimensions)
+        print(f"/ask through the fake API, {args.queries} questions, {args.answer_words}-token answers, "
+              f"{args.latency_ms:g} ms + {args.token_ms:g} ms/token (ms):")
+        for mode, mode_env in MODES.items():
+            env = {**os.environ, **mode_env, "OPENAI_BASE_URL": base_url, "OPENAI_API_KEY": "sk-fake",
+                   "ANSWER_CACHE_ENABLED": "false", "RELEVANCE_THRESHOLD": "-1", "ADMISSION_ENABLED": "false"}
+            before = server.completions
+            result = subprocess.run([sys.executable, "-m", "benchmarks.answer_modes", "--worker", path,
+                                     "--queries", str(args.queries)],
+                                    capture_output=True, text=True, cwd=backend_dir, env=env, check=True)
+            data = json.loads(result.stdout.strip().splitlines()[-1])
+            stats = summarize(data["samples"])
+            calls = (server.completions - before) / (args.queries + 1)
+            words = sum(data["answer_words"]) / len(data["answer_words"])
+            print(f"  {mode:<15} mean {stats['mean']:8.1f}  p50 {stats['p50']:8.1f}  p95 {stats['p95']:8.1f}"
+                  f"  completions/request {calls:.2f}  answer words {words:.0f}")
+
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""Deterministic local stand-in for the OpenAI embeddings and chat APIs, for offline rebuilds and benchmarks.
+
+Run standalone and point the OpenAI client at it:
+
+    python -m benchmarks.fake_openai --port 8100 --latency-ms 50 --token-ms 5 --rate-limit-every 10
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=sk-fake \
+        python -c "from chatbot.services import rebuild_vectorstore; rebuild_vectorstore()"
+"""
+import argparse
+import base64
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Short common words: one cl100k token each, and about 4 characters with the space,
+# so answer length in words ~ tokens by tiktoken and by count_tokens' estimate alike
+ANSWER_VOCABULARY = ("I", "led", "the", "team", "on", "data", "work", "and", "code", "with",
+                     "AWS", "for", "a", "new", "app", "we", "to", "my", "API", "at")
+
+
+def fake_embedding(item, dimensions: int) -> np.ndarray:
+    """Unit-length vector seeded by the input, so equal inputs always embed identically."""
+    seed = hashlib.sha256(json.dumps(item).encode("utf-8")).digest()
+    rng = np.random.default_rng(int.from_bytes(seed[:8], "little"))
+    vector = rng.standard_normal(dimensions).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class _Server(ThreadingHTTPServer):
+    # The default listen backlog of 5 drops connection bursts into 1 s SYN retries
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class FakeOpenAIServer:
+    """Threaded HTTP server implementing the OpenAI endpoints the chatbot uses."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, dimensions: int = 1536,
+                 latency_ms: float = 0, rate_limit_every: int = 0, answer_words: int = 80,
+                 token_ms: float = 0):
+        self.dimensions = dimensions
+        self.answer_words = answer_words
+        self.latency_ms = latency_ms
+        # Simulated generation time per completion token
+        self.token_ms = token_ms
+        self.rate_limit_every = rate_limit_every
+        self.requests = 0
+        self.rate_limited = 0
+        self.embedded_inputs = 0
+        self.completions = 0
+        # Wall time spent serving each endpoint, including simulated latency
+        self.busy_ms = {"embeddings": 0.0, "chat": 0.0}
+        self._lock = threading.Lock()
+        self._httpd = _Server((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+            "embedded_inputs": self.embedded_inputs,
+            "completions": self.completions,
+            "busy_ms": dict(self.busy_ms),
+        }
+
+    def _record_busy(self, endpoint: str, start: float):
+        with self._lock:
+            self.busy_ms[endpoint] += (time.perf_counter() - start) * 1000
+
+    def _should_rate_limit(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            if self.rate_limit_every and self.requests % self.rate_limit_every == 0:
+                self.rate_limited += 1
+                return True
+        return False
+
+    def embeddings(self, body: dict) -> dict:
+        inputs = body.get("input", [])
+        # Accept a string, a list of strings, a token list or a list of token lists
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        with self._lock:
+            self.embedded_inputs += len(inputs)
+        data = []
+        for index, item in enumerate(inputs):
+            vector = fake_embedding(item, body.get("dimensions") or self.dimensions)
+            if body.get("encoding_format") == "base64":
+                embedding = base64.b64encode(vector.tobytes()).decode("ascii")
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+        tokens = sum(len(item) if isinstance(item, list) else max(1, len(item) // 4) for item in inputs)
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "text-embedding-ada-002"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    def completion_text(self, body: dict) -> str:
+        """Canned answer capped by max_tokens, one token per word."""
+        words = self.answer_words
+        # langchain_openai sends max_completion_tokens, the openai SDK as called here max_tokens
+        max_tokens = body.get("max_completion_tokens") or body.get("max_tokens")
+        if max_tokens:
+            words = min(words, max_tokens - 1)
+        return " ".join(ANSWER_VOCABULARY[i % len(ANSWER_VOCABULARY)] for i in range(words)) + "."
+
+    def chat_completion(self, body: dict) -> dict:
+        with self._lock:
+            self.completions += 1
+        text = self.completion_text(body)
+        prompt_tokens = sum(max(1, len(str(m.get("content", ""))) // 4) for m in body.get("messages", []))
+        completion_tokens = len(text.split())
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": text}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    def chat_completion_chunks(self, body: dict):
+        """Yield the same answer as chat.completion.chunk events, one word per chunk."""
+        completion = self.chat_completion(body)
+        words = completion["choices"][0]["message"]["content"].split(" ")
+        base = {"id": completion["id"], "object": "chat.completion.chunk",
+                "created": completion["created"], "model": completion["model"]}
+        for i, word in enumerate(words):
+            if self.token_ms:
+                time.sleep(self.token_ms / 1000)
+            delta = {"content": word if i == 0 else " " + word}
+            if i == 0:
+                delta["role"] = "assistant"
+            yield dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": None}])
+        yield dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if (body.get("stream_options") or {}).get("include_usage"):
+            # Like the API: a final chunk with no choices carries the usage
+            yield dict(base, choices=[], usage=completion["usage"])
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, payload: dict, headers: dict = None):
+                content = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(content)
+
+            def _stream(self, events):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for event in list(events) + ["[DONE]"]:
+                    data = event if isinstance(event, str) else json.dumps(event)
+                    payload = f"data: {data}\n\n".encode("utf-8")
+                    self.wfile.write(f"{len(payload):x}\r\n".encode("ascii") + payload + b"\r\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def do_POST(self):
+                start = time.perf_counter()
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if server.latency_ms:
+                    time.sleep(server.latency_ms / 1000)
+                if server._should_rate_limit():
+                    self._send(429, {"error": {"message": "Rate limit reached (fake)", "type": "requests",
+                                               "code": "rate_limit_exceeded"}}, {"Retry-After": "0.05"})
+                    return
+                if self.path.rstrip("/").endswith("/embeddings"):
+                    self._send(200, server.embeddings(body))
+                    server._record_busy("embeddings", start)
+                elif self.path.rstrip("/").endswith("/chat/completions"):
+                    if body.get("stream"):
+                        self._stream(server.chat_completion_chunks(body))
+                    else:
+                        completion = server.chat_completion(body)
+                        if server.token_ms:
+                            time.sleep(server.token_ms * completion["usage"]["completion_tokens"] / 1000)
+                        self._send(200, completion)
+                    server._record_busy("chat", start)
+                else:
+                    self._send(404, {"error": {"message": f"Unknown endpoint {self.path}"}})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--rate-limit-every", type=int, default=0,
+                        help="Answer every Nth request with a 429")
+    parser.add_argument("--answer-words", type=int, default=80,
+                        help="Length of the canned chat completion")
+    parser.add_argument("--token-ms", type=float, default=0,
+                        help="Simulated generation time per completion token")
+    args = parser.parse_args()
+    server = FakeOpenAIServer(args.host, args.port, args.dimensions, args.latency_ms, args.rate_limit_every,
+                              args.answer_words, args.token_ms)
+    print(f"Fake OpenAI API listening on {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Cold-start benchmark: pickle FAISS index vs the memory-mapped and quantized formats.
+
+    python -m benchmarks.index_load --docs 20000
+    python -m benchmarks.index_load --index-path chatbot/faiss_index
+
+Each format is loaded in a fresh subprocess, so the numbers include nothing
+warmed by a previous load. Reports load time, resident memory added by the
+load, the latency of the first search and resident memory once that search
+has paged in what it touched.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from langchain_core.embeddings import Embeddings
+
+
+class RandomEmbeddings(Embeddings):
+    """Query embedder for the benchmark; no API calls."""
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+        self._rng = np.random.default_rng(0)
+
+    def _vector(self):
+        vector = self._rng.standard_normal(self.dimensions).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts):
+        return [self._vector() for _ in texts]
+
+    def embed_query(self, text):
+        return self._vector()
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def build_synthetic_index(path: str, docs: int, dimensions: int):
+    from langchain_community.vectorstores import FAISS
+    from chatbot.mmap_index import export_mmap_index
+    from chatbot.quantized_index import export_quantized_index
+
+    rng = np.random.default_rng(42)
+    vectors = rng.standard_normal((docs, dimensions)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    texts = [f"Synthetic chunk {i}. " + "Lorem ipsum dolor sit amet. " * 40 for i in range(docs)]
+    metadatas = [{"source": f"src/content/posts/post-{i}.mdx", "chunk": 0, "heading": "Intro"} for i in range(docs)]
+    vectorstore = FAISS.from_embeddings(list(zip(texts, vectors.tolist())), RandomEmbeddings(dimensions),
+                                        metadatas=metadatas)
+    vectorstore.save_local(path)
+    export_mmap_index(vectorstore, path)
+    export_quantized_index(vectorstore, path, "int8")
+
+
+def measure(index_format: str, path: str) -> dict:
+    """Runs inside the child process: import first, then time only the load and first search."""
+    from langchain_community.vectorstores import FAISS
+    from chatbot.mmap_index import load_mmap_index
+    from chatbot.quantized_index import load_quantized_index
+    import faiss
+
+    dimensions = faiss.read_index(os.path.join(path, "index.faiss"), faiss.IO_FLAG_MMAP_IFC
+                                  | faiss.IO_FLAG_READ_ONLY).d
+    embeddings = RandomEmbeddings(dimensions)
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    if index_format == "mmap":
+        vectorstore = load_mmap_index(path, embeddings)
+    elif index_format == "quantized":
+        vectorstore = load_quantized_index(path, embeddings)
+    else:
+        vectorstore = FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
+    load_ms = (time.perf_counter() - start) * 1000
+    rss_after_load = _rss_mb()
+    start = time.perf_counter()
+    vectorstore.similarity_search_by_vector(embeddings.embed_query(""), k=5)
+    search_ms = (time.perf_counter() - start) * 1000
+    rss_after_search = _rss_mb()
+    return {
+        "format": index_format,
+        "vectors": vectorstore.index.ntotal,
+        "load_ms": round(load_ms, 2),
+        "load_rss_mb": round(rss_after_load - rss_before, 1),
+        "first_search_ms": round(search_ms, 2),
+        # Mapped pages a search touches count against the Lambda memory limit too
+        "search_rss_mb": round(rss_after_search - rss_before, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cold-start cost of the pickle, mmap and quantized index formats")
+    parser.add_argument("--index-path", help="Existing index directory (default: build a synthetic one)")
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--child", choices=["pickle", "mmap", "quantized"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.index_path)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.index_path
+        if path is None:
+            path = tmp
+            print(f"Building synthetic index: {args.docs} x {args.dimensions}")
+            build_synthetic_index(path, args.docs, args.dimensions)
+        else:
+            from chatbot.mmap_index import has_mmap_index
+            if not has_mmap_index(path):
+                sys.exit(f"{path} has no mmap index; run rebuild_vectorstore() first")
+        from chatbot.quantized_index import find_quantized_vectors
+        formats = ["pickle", "mmap"] + (["quantized"] if find_quantized_vectors(path) else [])
+        results = []
+        for index_format in formats:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.index_load", "--child", index_format, "--index-path", path],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'format':<10} {'vectors':>8} {'load ms':>10} {'load MB':>9} {'1st search ms':>14} {'after search MB':>16}")
+    for row in results:
+        print(f"{row['format']:<10} {row['vectors']:>8} {row['load_ms']:>10} {row['load_rss_mb']:>9} "
+              f"{row['first_search_ms']:>14} {row['search_rss_mb']:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+"""Offline load test of /ask, /chat and rebuild_vectorstore against the fake OpenAI server.
+
+    python -m benchmarks.load_test --concurrency 1,8,32 --requests 200 --latency-ms 50 --token-ms 2 \\
+        --output /tmp/load-$(git rev-parse --short HEAD).json
+    python -m benchmarks.load_test --compare results/before.json results/after.json
+
+The FastAPI app runs in-process, driven over ASGI by concurrent clients
+(transport "asgi") and through the Mangum Lambda handler with API Gateway v2
+events, one invocation at a time as in a Lambda container (transport
+"mangum"). Embeddings and completions come from the local fake server with
+fixed per-request latency and per-token generation time, so runs are
+deterministic and cost nothing. Every question is distinct and the answer
+cache is off, so each request runs the full pipeline.
+
+For each target, transport and concurrency level it reports p50/p95/p99
+latency, throughput and per-stage time: the fake API's time serving
+embeddings and completions per request, the remainder spent in the app, and
+the mean of each stage in the app's Server-Timing headers (METRICS_ENABLED).
+The rebuild target times a cold and an incremental rebuild of a synthetic
+content tree. --output writes everything as JSON; --compare diffs two such
+files.
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_openai import FakeOpenAIServer
+
+TARGETS = ("ask", "chat", "rebuild")
+TRANSPORTS = ("asgi", "mangum")
+
+
+def percentile(samples, q: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    if not samples:
+        return 0.0
+    rank = max(1, int(round(q / 100 * len(samples) + 0.5)))
+    return samples[min(rank, len(samples)) - 1]
+
+
+def latency_stats(samples_ms) -> dict:
+    samples = sorted(samples_ms)
+    return {
+        "mean": sum(samples) / len(samples) if samples else 0.0,
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+        "max": samples[-1] if samples else 0.0,
+    }
+
+
+@contextlib.contextmanager
+def quiet(enabled: bool = True):
+    """Swallow the app's per-request prints while measuring."""
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def questions(prefix: str, count: int):
+    # Distinct questions that pass the content filter
+    return [f"Tell me about your experience with project {prefix}-{i}" for i in range(count)]
+
+
+def api_gateway_event(path: str, payload: dict) -> dict:
+    """API Gateway HTTP API (payload v2.0) event for a JSON POST."""
+    return {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": path,
+        "rawQueryString": "",
+        "headers": {"content-type": "application/json", "host": "localhost"},
+        "requestContext": {
+            "http": {"method": "POST", "path": path, "protocol": "HTTP/1.1", "sourceIp": "127.0.0.1"},
+            "stage": "$default",
+            "requestId": "load-test",
+            "routeKey": "$default",
+        },
+        "body": json.dumps(payload),
+        "isBase64Encoded": False,
+    }
+
+
+def parse_server_timing(header: str) -> dict:
+    """{"embed": 12.3, ...} from a Server-Timing header value."""
+    timings = {}
+    for metric in filter(None, (part.strip() for part in (header or "").split(","))):
+        name, _, params = metric.partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur":
+                timings[name.strip()] = float(value)
+    return timings
+
+
+def failed(status: int, body: bytes) -> bool:
+    # /ask reports pipeline errors in a 200 answer
+    return status != 200 or b"I encountered an error" in body
+
+
+async def run_asgi(app, path: str, payloads, concurrency: int):
+    """POST every payload with `concurrency` clients; returns (latencies_ms, errors, wall_s, timings)."""
+    import httpx
+
+    latencies, errors, timings = [], 0, []
+    pending = iter(payloads)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test",
+                                 timeout=120) as client:
+        async def worker():
+            nonlocal errors
+            for payload in pending:
+                start = time.perf_counter()
+                response = await client.post(path, json=payload)
+                latencies.append((time.perf_counter() - start) * 1000)
+                errors += failed(response.status_code, response.content)
+                timings.append(parse_server_timing(response.headers.get("server-timing")))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return latencies, errors, time.perf_counter() - start, timings
+
+
+def run_mangum(handler, path: str, payloads):
+    """Invoke the Lambda handler once per payload, sequentially."""
+    latencies, errors, timings = [], 0, []
+    start = time.perf_counter()
+    for payload in payloads:
+        request_start = time.perf_counter()
+        response = handler(api_gateway_event(path, payload), None)
+        latencies.append((time.perf_counter() - request_start) * 1000)
+        errors += failed(response["statusCode"], response["body"].encode("utf-8"))
+        timings.append(parse_server_timing(response["headers"].get("server-timing")))
+    return latencies, errors, time.perf_counter() - start, timings
+
+
+def mean_server_timing(timings) -> dict:
+    """Mean duration per Server-Timing stage; a stage missing from a response counts as 0."""
+    totals = {}
+    for entry in timings:
+        for name, duration in entry.items():
+            totals[name] = totals.get(name, 0.0) + duration
+    return {name: total / len(timings) for name, total in totals.items()} if timings else {}
+
+
+def stage_breakdown(server, before: dict, requests: int, mean_ms: float) -> dict:
+    """Per-request fake API time by endpoint; "app" is the rest of the mean latency."""
+    after = server.stats()
+    embeddings = (after["busy_ms"]["embeddings"] - before["busy_ms"]["embeddings"]) / requests
+    completions = (after["busy_ms"]["chat"] - before["busy_ms"]["chat"]) / requests
+    return {
+        "embeddings": embeddings,
+        "completions": completions,
+        "app": max(0.0, mean_ms - embeddings - completions),
+        "upstream_requests": (after["requests"] - before["requests"]) / requests,
+    }
+
+
+def load_app(index_path: str):
+    """Import the app with the shared index pointed at `index_path`."""
+    from langchain_openai import OpenAIEmbeddings
+
+    from chatbot import index_manager, main
+    from chatbot.http_clients import openai_client_kwargs
+
+    index_manager.find_index_path = lambda: index_path
+    # Skip tiktoken's length check; the fake server accepts raw strings
+    main.index_manager.embeddings_factory = lambda: OpenAIEmbeddings(check_embedding_ctx_length=False,
+                                                                     **openai_client_kwargs())
+    return main
+
+
+def bench_http(main, server, target: str, transport: str, concurrency: int, requests: int, verbose: bool) -> dict:
+    path = "/ask" if target == "ask" else "/chat"
+    payloads = [{"question": question} for question in questions(f"{transport}{concurrency}", requests + 1)]
+
+    def run(batch, level):
+        if transport == "asgi":
+            return asyncio.get_event_loop().run_until_complete(run_asgi(main.app, path, batch, level))
+        return run_mangum(main.handler, path, batch)
+
+    with quiet(not verbose):
+        # The first request of a level may load the index and build chains; report it separately
+        start = time.perf_counter()
+        run(payloads[:1], 1)
+        first_ms = (time.perf_counter() - start) * 1000
+        before = server.stats()
+        latencies, errors, wall, timings = run(payloads[1:], concurrency)
+    stats = latency_stats(latencies)
+    return {
+        "target": target,
+        "transport": transport,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "first_request_ms": first_ms,
+        "throughput_rps": len(latencies) / wall if wall else 0.0,
+        "latency_ms": stats,
+        "stages_ms": stage_breakdown(server, before, len(latencies), stats["mean"]),
+        "server_timing_ms": mean_server_timing(timings),
+    }
+
+
+def write_content(content_dir: str, files: int, start: int = 0):
+    """Synthetic MDX posts, a few headed sections each."""
+    posts = os.path.join(content_dir, "posts")
+    os.makedirs(posts, exist_ok=True)
+    for i in range(start, start + files):
+        sections = "\n\n".join(
+            f"## Section {s}\n\n" + f"Post {i} section {s} covers AWS, Python and team leadership. " * 20
+            for s in range(4)
+        )
+        with open(os.path.join(posts, f"post-{i}.mdx"), "w", encoding="utf-8") as f:
+            f.write(f"---\ntitle: Post {i}\n---\n\n# Post {i}\n\n{sections}\n")
+
+
+def bench_rebuild(server, files: int, changed: int, verbose: bool) -> dict:
+    """Cold rebuild of `files` posts, then an incremental one after editing `changed` of them."""
+    import functools
+
+    from langchain_openai import OpenAIEmbeddings
+
+    from chatbot import content_ingest, services
+
+    workdir = tempfile.mkdtemp(prefix="load-test-rebuild-")
+    content_dir = os.path.join(workdir, "content")
+    content_ingest.CONTENT_DIR = content_dir
+    content_ingest.REBUILD_TRACK_FILE = os.path.join(workdir, "last_rebuild.json")
+    services.faiss_index_path = os.path.join(workdir, "faiss_index")
+    services.OpenAIEmbeddings = functools.partial(OpenAIEmbeddings, check_embedding_ctx_length=False)
+    write_content(content_dir, files)
+
+    results = {}
+    for phase in ("cold", "incremental"):
+        if phase == "incremental":
+            time.sleep(0.01)  # Edited files need a newer mtime than the last rebuild
+            for i in range(changed):
+                with open(os.path.join(content_dir, "posts", f"post-{i}.mdx"), "a", encoding="utf-8") as f:
+                    f.write("\nUpdated paragraph.\n")
+        before = server.stats()
+        with quiet(not verbose):
+            start = time.perf_counter()
+            vectorstore = services.rebuild_vectorstore()
+            seconds = time.perf_counter() - start
+        after = server.stats()
+        results[phase] = {
+            "seconds": seconds,
+            "vectors": vectorstore.index.ntotal,
+            "embedded_inputs": after["embedded_inputs"] - before["embedded_inputs"],
+            "embedding_requests": after["requests"] - before["requests"],
+            "embeddings_ms": after["busy_ms"]["embeddings"] - before["busy_ms"]["embeddings"],
+        }
+    results["files"] = files
+    results["changed"] = changed
+    return results
+
+
+def print_results(report: dict):
+    print(f"{'target':<7} {'transport':<9} {'conc':>4} {'req':>5} {'err':>4} {'rps':>8} "
+          f"{'p50':>8} {'p95':>8} {'p99':>8} {'embed':>7} {'llm':>8} {'app':>7}  (ms)")
+    for row in report["results"]:
+        latency, stages = row["latency_ms"], row["stages_ms"]
+        print(f"{row['target']:<7} {row['transport']:<9} {row['concurrency']:>4} {row['requests']:>5} "
+              f"{row['errors']:>4} {row['throughput_rps']:>8.1f} {latency['p50']:>8.1f} {latency['p95']:>8.1f} "
+              f"{latency['p99']:>8.1f} {stages['embeddings']:>7.1f} {stages['completions']:>8.1f} "
+              f"{stages['app']:>7.1f}")
+        if row.get("server_timing_ms"):
+            print("    server-timing: " + ", ".join(f"{name} {duration:.1f}"
+                                                 for name, duration in row["server_timing_ms"].items()))
+    rebuild = report.get("rebuild")
+    if rebuild:
+        for phase in ("cold", "incremental"):
+            data = rebuild[phase]
+            print(f"rebuild {phase:<11} {data['seconds']:.2f} s, {data['embedded_inputs']} texts embedded in "
+                  f"{data['embedding_requests']} requests ({data['embeddings_ms']:.0f} ms in the fake API), "
+                  f"{data['vectors']} vectors")
+
+
+def compare(before_path: str, after_path: str):
+    """Print p50/p95/p99 and throughput changes between two --output files."""
+    with open(before_path, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(after_path, encoding="utf-8") as f:
+        after = json.load(f)
+
+    def keyed(report):
+        return {(row["target"], row["transport"], row["concurrency"]): row for row in report["results"]}
+
+    def change(old, new):
+        return f"{new:9.1f} ({(new - old) / old * 100:+6.1f}%)" if old else f"{new:9.1f}"
+
+    print(f"{before['meta']['commit'][:10]} -> {after['meta']['commit'][:10]}")
+    old_rows = keyed(before)
+    for key, row in keyed(after).items():
+        old = old_rows.get(key)
+        if old is None:
+            continue
+        print(f"{key[0]:<5} {key[1]:<7} c={key[2]:<3} "
+              f"p50 {change(old['latency_ms']['p50'], row['latency_ms']['p50'])}  "
+              f"p95 {change(old['latency_ms']['p95'], row['latency_ms']['p95'])}  "
+              f"p99 {change(old['latency_ms']['p99'], row['latency_ms']['p99'])}  "
+              f"rps {change(old['throughput_rps'], row['throughput_rps'])}")
+    if before.get("rebuild") and after.get("rebuild"):
+        for phase in ("cold", "incremental"):
+            print(f"rebuild {phase:<11} s "
+                  f"{change(before['rebuild'][phase]['seconds'], after['rebuild'][phase]['seconds'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test against the fake OpenAI server")
+    parser.add_argument("--targets", default="ask,chat,rebuild", help=f"Comma-separated subset of {TARGETS}")
+    parser.add_argument("--transports", default="asgi,mangum", help=f"Comma-separated subset of {TRANSPORTS}")
+    parser.add_argument("--concurrency", default="1,8,32", help="Concurrency levels for the asgi transport")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per target and level")
+    parser.add_argument("--mangum-requests", type=int, default=20, help="Sequential Lambda invocations")
+    parser.add_argument("--docs", type=int, default=400, help="Chunks in the synthetic index")
+    parser.add_argument("--index-path", help="Serve an existing index instead of a synthetic one")
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--latency-ms", type=float, default=50, help="Fake API latency per request")
+    parser.add_argument("--token-ms", type=float, default=2, help="Fake API generation time per token")
+    parser.add_argument("--answer-words", type=int, default=120)
+    parser.add_argument("--rebuild-files", type=int, default=100)
+    parser.add_argument("--rebuild-changed", type=int, default=10)
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Diff two --output files")
+    parser.add_argument("--verbose", action="store_true", help="Keep the app's own output")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    targets = [target for target in args.targets.split(",") if target]
+    transports = [transport for transport in args.transports.split(",") if transport]
+    levels = [int(level) for level in args.concurrency.split(",") if level]
+
+    server = FakeOpenAIServer(dimensions=args.dimensions, latency_ms=args.latency_ms,
+                              answer_words=args.answer_words, token_ms=args.token_ms)
+    os.environ["OPENAI_BASE_URL"] = server.start()
+    os.environ["OPENAI_API_KEY"] = "sk-fake"
+    os.environ.setdefault("ANSWER_CACHE_ENABLED", "false")
+    os.environ.setdefault("INDEX_RELOAD_INTERVAL", "0")
+    os.environ.setdefault("METRICS_ENABLED", "true")
+    # Every request comes from one client; measure the pipeline, not the rate limiter
+    os.environ.setdefault("ADMISSION_ENABLED", "false")
+    workdir = tempfile.mkdtemp(prefix="load-test-")
+    os.environ.setdefault("EMBEDDING_CACHE_PATH", os.path.join(workdir, "embedding_cache.sqlite3"))
+    if not args.index_path:
+        # Random synthetic queries are unrelated to every chunk; let them through to the model
+        os.environ.setdefault("RELEVANCE_THRESHOLD", "-1")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": [],
+    }
+
+    http_targets = [target for target in targets if target in ("ask", "chat")]
+    if http_targets:
+        index_path = args.index_path
+        if not index_path:
+            from benchmarks.index_load import build_synthetic_index
+            index_path = os.path.join(workdir, "faiss_index")
+            with quiet(not args.verbose):
+                build_synthetic_index(index_path, args.docs, args.dimensions)
+        app_module = load_app(index_path)
+        # One loop for the whole run, as under uvicorn or in a Lambda container; pooled
+        # HTTP connections belong to the loop that opened them
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        for target in http_targets:
+            for transport in transports:
+                for level in (levels if transport == "asgi" else [1]):
+                    requests = args.requests if transport == "asgi" else args.mangum_requests
+                    row = bench_http(app_module, server, target, transport, level, requests, args.verbose)
+                    report["results"].append(row)
+                    print(f"  {target} {transport} c={level}: p50 {row['latency_ms']['p50']:.1f} ms, "
+                          f"{row['throughput_rps']:.1f} req/s, {row['errors']} errors", file=sys.stderr)
+
+    if "rebuild" in targets:
+        report["rebuild"] = bench_rebuild(server, args.rebuild_files, args.rebuild_changed, args.verbose)
+
+    server.stop()
+    print_results(report)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
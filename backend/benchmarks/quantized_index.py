@@ -0,0 +1,103 @@
+"""Memory footprint vs recall@k of the quantized index options.
+
+    python -m benchmarks.quantized_index --index-path chatbot/faiss_index
+    python -m benchmarks.quantized_index --docs 20000
+
+Uses the vectors of an existing index (our own corpus) or a synthetic clustered
+set. Queries are indexed vectors plus Gaussian noise, so each has a known
+neighbourhood; ground truth is exact float32 search. For every option it
+reports bytes held in memory, bytes only mapped (read for re-ranked rows),
+recall@1/5/10 against exact search and mean search latency.
+"""
+import argparse
+import os
+import time
+
+import faiss
+import numpy as np
+
+from chatbot.quantized_index import QUANTIZED_RERANK_FACTOR, quantize_index, refine_index
+
+RECALL_AT = (1, 5, 10)
+# PQ codebooks have 256 centroids per sub-quantizer; faiss wants ~39 training points per centroid
+PQ_MIN_TRAINING = 256 * 39
+
+
+def load_vectors(index_path: str) -> np.ndarray:
+    for name in ("vectors.mmap.faiss", "index.faiss"):
+        path = os.path.join(index_path, name)
+        if os.path.exists(path):
+            index = faiss.read_index(path)
+            return index.reconstruct_n(0, index.ntotal)
+    raise SystemExit(f"No FAISS index in {index_path}")
+
+
+def synthetic_vectors(docs: int, dimensions: int, topics: int = 50, seed: int = 42) -> np.ndarray:
+    """Unit vectors clustered around topic centroids, like chunks of a handful of posts."""
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((topics, dimensions)).astype(np.float32)
+    vectors = centroids[rng.integers(0, topics, docs)] + 0.6 * rng.standard_normal((docs, dimensions)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_queries(vectors: np.ndarray, count: int, noise: float, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.integers(0, len(vectors), count)]
+    queries = queries + noise * rng.standard_normal(queries.shape).astype(np.float32) / np.sqrt(vectors.shape[1])
+    return (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+
+
+def recall(found: np.ndarray, truth: np.ndarray, k: int) -> float:
+    return float(np.mean([len(set(f[:k]) & set(t[:k])) / k for f, t in zip(found, truth)]))
+
+
+def options(flat, vectors: np.ndarray):
+    """(name, index, resident bytes, mapped bytes) for every option worth comparing."""
+    full_bytes = vectors.nbytes
+    yield "float32 (current)", flat, full_bytes, 0
+    for kind in ("fp16", "int8"):
+        quantized = quantize_index(flat, kind)
+        code_bytes = quantized.sa_code_size() * quantized.ntotal
+        yield f"{kind}", quantized, code_bytes, 0
+        yield f"{kind} + re-rank x{QUANTIZED_RERANK_FACTOR}", refine_index(quantized, flat), code_bytes, full_bytes
+    if len(vectors) >= PQ_MIN_TRAINING:
+        m = next(m for m in (96, 64, 48, 32, 16, 8) if vectors.shape[1] % m == 0)
+        pq = faiss.IndexPQ(vectors.shape[1], m, 8)
+        pq.train(vectors)
+        pq.add(vectors)
+        code_bytes = pq.sa_code_size() * pq.ntotal + pq.pq.centroids.size() * 4
+        yield f"PQ{m}x8 + re-rank x{QUANTIZED_RERANK_FACTOR}", refine_index(pq, flat), code_bytes, full_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantized index memory vs recall@k")
+    parser.add_argument("--index-path", help="Existing index directory (default: synthetic vectors)")
+    parser.add_argument("--docs", type=int, default=400, help="Synthetic vectors (about the blog corpus size)")
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--noise", type=float, default=0.5, help="Query noise relative to a unit vector")
+    args = parser.parse_args()
+
+    vectors = load_vectors(args.index_path) if args.index_path else synthetic_vectors(args.docs, args.dimensions)
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    flat = faiss.IndexFlatL2(vectors.shape[1])
+    flat.add(vectors)
+    queries = make_queries(vectors, args.queries, args.noise)
+    k = max(RECALL_AT)
+    _, truth = flat.search(queries, k)
+
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries")
+    print(f"{'option':<24} {'in memory MB':>13} {'mapped MB':>10} " +
+          " ".join(f"{f'recall@{r}':>9}" for r in RECALL_AT) + f" {'search ms':>10}")
+    for name, index, resident, mapped in options(flat, vectors):
+        start = time.perf_counter()
+        _, found = index.search(queries, k)
+        search_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        print(f"{name:<24} {resident / 2 ** 20:>13.2f} {mapped / 2 ** 20:>10.2f} " +
+              " ".join(f"{recall(found, truth, r):>9.3f}" for r in RECALL_AT) + f" {search_ms:>10.3f}")
+    if len(vectors) < PQ_MIN_TRAINING:
+        print(f"PQ skipped: needs at least {PQ_MIN_TRAINING} vectors to train its codebooks")
+
+
+if __name__ == "__main__":
+    main()
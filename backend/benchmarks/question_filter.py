@@ -0,0 +1,97 @@
+"""Micro-benchmark for the compiled question filter against the original per-pattern one.
+
+    python -m benchmarks.question_filter
+    python -m benchmarks.question_filter --questions 20000 --repeat 5
+
+Times filters.is_question_about_tc and classify_questions against the original
+implementation (kept verbatim below as legacy_is_question_about_tc) on generated
+questions. tests/test_question_filter.py checks that all three make the same
+allow/deny decisions.
+"""
+import argparse
+import random
+import re
+import time
+
+from chatbot.filters import ALLOWED_PATTERNS, BLOCKED_PATTERNS, classify_questions, is_question_about_tc
+
+
+def legacy_is_question_about_tc(question: str) -> bool:
+    """The filter as it was before the single-pass rewrite."""
+    question_lower = question.lower()
+
+    blocked_patterns = [
+        r'\b(weather|news|current events|stock|price|recipe|joke|story)\b',
+        r'\b(calculate|solve)\s+\d+|what is \d+',
+        r'write.*code|create.*function|generate.*script(?!.*tc|.*work|.*project)',
+    ]
+
+    for pattern in blocked_patterns:
+        if re.search(pattern, question_lower, re.IGNORECASE):
+            return False
+
+    allowed_patterns = [
+        r'\b(tc|heiner|you|your)\b',
+        r'\b(tell me about|who is|who are you|about you|introduce)\b',
+        r'\b(experience|work|job|career|project|skill|background|education|resume|cv)\b',
+        r'\b(development|engineering|coding|programming|software|technical|ai|machine learning|data|architect)\b',
+        r'\b(hire|hiring|interview|candidate|qualification|position|role)\b',
+        r'\b(what do you do|what is your)\b',
+        r'\b(personality|character|traits|values|culture|cultural|fit|working style|work style|communication|collaborate|collaboration|team|leadership|manage|management)\b',
+        r'\b(motivation|motivated|drive|driven|passion|passionate|interest|interests|approach|philosophy|mindset|attitude)\b',
+        r'\b(problem.solving|decision.making|conflict|stress|pressure|challenge|adapt|adaptable|flexible|creativity|creative)\b',
+        r'\b(mentor|mentoring|learn|learning|grow|growth|feedback|improve|improvement|strengths|weaknesses|development)\b',
+        r'\b(behavior|behavioral|situation|situational|example|tell me about a time|describe a time|how do you|how would you)\b',
+    ]
+
+    for pattern in allowed_patterns:
+        if re.search(pattern, question_lower, re.IGNORECASE):
+            return True
+
+    return False
+
+
+VOCABULARY = sorted({word for pattern in BLOCKED_PATTERNS + ALLOWED_PATTERNS
+                     for word in re.findall(r"[a-z]+", pattern) if len(word) > 1}) + [
+    "the", "a", "of", "at", "for", "me", "is", "what", "how", "2", "42", "3.5", "manaburn", "wells", "fargo",
+    "kubernetes", "python", "?", "!", "'s", "-", "_", "TC", "YOUR", "Weather", "ſ", "ı", "é",
+]
+
+
+def generated_questions(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    for _ in range(count):
+        words = rng.choices(VOCABULARY, k=rng.randint(1, 12))
+        separators = rng.choices([" ", " ", " ", "", "-", "  ", "\n"], k=len(words))
+        yield "".join(word + sep for word, sep in zip(words, separators)).strip()
+
+
+def time_per_question_us(fn, questions, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(questions)
+        best = min(best, time.perf_counter() - start)
+    return best / len(questions) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compiled question filter speed")
+    parser.add_argument("--questions", type=int, default=50000, help="Generated questions to time")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    questions = list(generated_questions(args.questions))
+    print(f"{len(questions)} questions, {sum(classify_questions(questions))} allowed")
+
+    timings = {
+        "legacy": time_per_question_us(lambda qs: [legacy_is_question_about_tc(q) for q in qs], questions, args.repeat),
+        "compiled": time_per_question_us(lambda qs: [is_question_about_tc(q) for q in qs], questions, args.repeat),
+        "batch": time_per_question_us(classify_questions, questions, args.repeat),
+    }
+    for name, us in timings.items():
+        print(f"  {name:<9} {us:7.2f} us/question  ({timings['legacy'] / us:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
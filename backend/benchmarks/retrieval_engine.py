@@ -0,0 +1,135 @@
+"""Benchmark the RetrievalQA chain against the lean NumPy engine (RETRIEVAL_ENGINE).
+
+    python -m benchmarks.retrieval_engine --docs 400 --queries 200
+
+Both engines answer the same questions against the same synthetic index, with
+embeddings and completions served by the local fake OpenAI server, so the
+numbers measure client-side overhead only. Reports:
+
+- import time of each engine's modules, in fresh interpreters
+- retrieval + prompt assembly for a precomputed query vector (no network)
+- full invoke() latency through the fake API
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+from benchmarks.fake_openai import FakeOpenAIServer
+from benchmarks.index_load import RandomEmbeddings, build_synthetic_index
+
+ENGINE_IMPORTS = {
+    "langchain": "import langchain.chains, langchain_openai, langchain.prompts",
+    "numpy": "import chatbot.lean_qa, openai, numpy",
+}
+
+
+def import_ms(statement: str, repeat: int) -> float:
+    """Fastest wall time of `statement` in a fresh interpreter."""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = f"import time; s = time.perf_counter(); {statement}; print((time.perf_counter() - s) * 1000)"
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=backend_dir, check=True)
+        runs.append(float(result.stdout.strip()))
+    return min(runs)
+
+
+def summarize(samples_ms) -> dict:
+    samples = sorted(samples_ms)
+    return {
+        "mean": statistics.fmean(samples),
+        "p50": samples[len(samples) // 2],
+        "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+def time_calls(fn, args_list) -> dict:
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def build_engines(path: str, dimensions: int):
+    from langchain.prompts import PromptTemplate
+    from langchain_community.vectorstores import FAISS
+    from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+    from chatbot.http_clients import openai_client_kwargs
+    from chatbot.hybrid_retriever import HybridRetriever
+    from chatbot.lean_qa import LeanQA, NumpyIndex
+    from chatbot.prompts import prompt_template
+    from chatbot.qa_chain import GroundedRetrievalQA
+
+    # Skip tiktoken's length check; the fake server accepts raw strings
+    embeddings = OpenAIEmbeddings(check_embedding_ctx_length=False, **openai_client_kwargs())
+    vectorstore = FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
+    prompt = PromptTemplate(template=prompt_template, input_variables=["context", "question"])
+    # Random queries are irrelevant to every chunk; disable the threshold so both engines call the model
+    chain = GroundedRetrievalQA.from_chain_type(
+        llm=ChatOpenAI(model="gpt-4o-mini", temperature=0.3, max_tokens=400, **openai_client_kwargs()),
+        retriever=HybridRetriever(vectorstore=vectorstore, k=5, min_relevance=-1.0),
+        return_source_documents=True,
+        chain_type_kwargs={"prompt": prompt},
+    )
+    lean = LeanQA(NumpyIndex.from_vectorstore(vectorstore), os.environ["OPENAI_API_KEY"], min_relevance=-1.0)
+    return vectorstore, prompt, chain, lean
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RetrievalQA chain vs lean NumPy engine")
+    parser.add_argument("--docs", type=int, default=400, help="Chunks in the synthetic index")
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--import-repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("Import time (fastest of fresh interpreters):")
+    for engine, statement in ENGINE_IMPORTS.items():
+        print(f"  {engine:<10} {import_ms(statement, args.import_repeat):8.1f} ms")
+
+    server = FakeOpenAIServer(dimensions=args.dimensions)
+    os.environ["OPENAI_BASE_URL"] = server.start()
+    os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+
+    with tempfile.TemporaryDirectory() as path:
+        build_synthetic_index(path, args.docs, args.dimensions)
+        vectorstore, prompt, chain, lean = build_engines(path, args.dimensions)
+
+        from chatbot.retrieval import build_prompt, format_context
+
+        queries = [f"Question {i} about the projects?" for i in range(args.queries)]
+        vectors = RandomEmbeddings(args.dimensions).embed_documents(queries)
+
+        def chain_retrieve(question, vector):
+            docs = [doc for doc, score in vectorstore.similarity_search_with_score_by_vector(vector, k=5)]
+            prompt.format(context=format_context(docs), question=question)
+
+        def lean_retrieve(question, vector):
+            build_prompt(question, lean.index.documents_for(lean.index.search(vector, 5)))
+
+        print(f"\nRetrieval + prompt assembly, {args.docs} chunks, no network (ms):")
+        for name, fn in (("langchain", chain_retrieve), ("numpy", lean_retrieve)):
+            fn(queries[0], vectors[0])
+            stats = time_calls(fn, list(zip(queries, vectors)))
+            print(f"  {name:<10} mean {stats['mean']:.3f}  p50 {stats['p50']:.3f}  p95 {stats['p95']:.3f}")
+
+        print(f"\nFull invoke() through the fake API, {args.queries} questions (ms):")
+        for name, engine in (("langchain", chain), ("numpy", lean)):
+            engine.invoke({"query": queries[0]})
+            stats = time_calls(lambda q: engine.invoke({"query": q}), [(q,) for q in queries])
+            print(f"  {name:<10} mean {stats['mean']:.3f}  p50 {stats['p50']:.3f}  p95 {stats['p95']:.3f}")
+
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""Admission control for /ask and /chat: per-client token buckets and a bounded concurrency queue.
+
+Each request first takes a token from its client's bucket (RATE_LIMIT_PER_MINUTE,
+refilled continuously, up to RATE_LIMIT_BURST); a batch takes one per question
+it will answer. Clients are identified by a hash
+of their own API key when they send one, otherwise by source IP (on Lambda,
+Mangum takes it from the API Gateway request context). Then it takes one of
+MAX_CONCURRENT_REQUESTS slots, waiting in a FIFO queue of at most
+ADMISSION_QUEUE_SIZE for up to ADMISSION_QUEUE_TIMEOUT seconds. Anything over
+a limit is rejected straight away with a 429 and Retry-After, instead of
+queueing behind OpenAI and stretching everyone's tail latency.
+
+Buckets and slots are in-process. ADMISSION_BACKEND="package.module:factory"
+swaps the buckets for a shared store (e.g. Redis) implementing
+RateLimitBackend, so the rate limit holds across Lambda containers; the
+concurrency limit always protects the local process.
+"""
+import asyncio
+import importlib
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from .cache import LRUCache
+from .metrics import Counter
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "20"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "10"))
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "32"))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "64"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2.0"))
+ADMISSION_BACKEND = os.getenv("ADMISSION_BACKEND", "")
+
+DECISIONS = Counter("chatbot_admission_total", "Admission decisions by route and outcome", ("route", "outcome"))
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is over its rate limit or the server is saturated; answered with a 429."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class RateLimitBackend:
+    """Token-bucket store; take() returns 0 when `cost` tokens were taken, else seconds until they can be.
+
+    A cost above burst can never be covered by a full bucket, so it is admitted
+    once the bucket is full and leaves it in debt: the client waits for the
+    whole cost to refill before its next request.
+    """
+
+    def take(self, client: str, rate_per_second: float, burst: float, cost: float = 1) -> float:
+        raise NotImplementedError
+
+
+class InMemoryBuckets(RateLimitBackend):
+    """Per-process buckets; idle clients expire from a bounded LRU, which is the same as a full bucket."""
+
+    def __init__(self, maxsize: int = 10000):
+        # client -> (tokens, last refill); a bucket refills to full in burst / rate seconds
+        self._buckets = LRUCache(maxsize=maxsize, ttl=3600)
+        self._lock = threading.Lock()
+
+    def take(self, client: str, rate_per_second: float, burst: float, cost: float = 1) -> float:
+        now = time.monotonic()
+        needed = min(cost, burst)
+        with self._lock:
+            tokens, updated = self._buckets.get(client, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate_per_second)
+            if tokens >= needed:
+                self._buckets.set(client, (tokens - cost, now))
+                return 0.0
+            self._buckets.set(client, (tokens, now))
+            return (needed - tokens) / rate_per_second
+
+
+class ConcurrencyLimiter:
+    """At most `limit` requests run at once; up to `queue_size` more wait FIFO for `timeout` seconds.
+
+    Plain counters and per-waiter futures rather than an asyncio.Semaphore, so
+    the queue length is bounded and known.
+    """
+
+    def __init__(self, limit: int, queue_size: int, timeout: float):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.active = 0
+        self._waiters = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Take a slot; returns whether the request had to queue. Raises AdmissionRejected."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return False
+        if len(self._waiters) >= self.queue_size:
+            raise AdmissionRejected("queue_full", self.timeout)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Handed a slot just as we gave up; pass it on
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise AdmissionRejected("queue_timeout", self.timeout) from None
+            raise
+        return True
+
+    def release(self):
+        # Hand the slot straight to the next waiter, so arrivals can't overtake the queue
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class Ticket:
+    """An admitted request's concurrency slot; release() is idempotent."""
+
+    def __init__(self, limiter: Optional[ConcurrencyLimiter]):
+        self._limiter = limiter
+
+    def release(self):
+        limiter, self._limiter = self._limiter, None
+        if limiter is not None:
+            limiter.release()
+
+
+class AdmissionController:
+    """Token buckets from a RateLimitBackend in front of one ConcurrencyLimiter."""
+
+    def __init__(self, backend: RateLimitBackend = None, rate_per_minute: float = RATE_LIMIT_PER_MINUTE,
+                 burst: float = RATE_LIMIT_BURST, max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+                 queue_size: int = ADMISSION_QUEUE_SIZE, queue_timeout: float = ADMISSION_QUEUE_TIMEOUT):
+        self.backend = backend or InMemoryBuckets()
+        self.rate_per_second = rate_per_minute / 60
+        self.burst = burst
+        self.limiter = ConcurrencyLimiter(max_concurrent, queue_size, queue_timeout)
+
+    async def acquire(self, client: str, route: str, cost: float = 1) -> Ticket:
+        """Admit one request costing `cost` tokens or raise AdmissionRejected; the caller must release() the ticket."""
+        if self.rate_per_second > 0:
+            try:
+                wait = self.backend.take(client, self.rate_per_second, self.burst, cost)
+            except Exception as e:
+                # A shared store being down shouldn't take the chatbot down with it
+                print(f"Rate limit backend failed, admitting: {e}")
+                wait = 0.0
+            if wait > 0:
+                DECISIONS.inc(route=route, outcome="rate_limited")
+                raise AdmissionRejected("rate_limited", wait)
+        try:
+            queued = await self.limiter.acquire()
+        except AdmissionRejected as e:
+            DECISIONS.inc(route=route, outcome=e.reason)
+            raise
+        DECISIONS.inc(route=route, outcome="queued" if queued else "admitted")
+        return Ticket(self.limiter)
+
+    @asynccontextmanager
+    async def admit(self, client: str, route: str, cost: float = 1):
+        ticket = await self.acquire(client, route, cost)
+        try:
+            yield
+        finally:
+            ticket.release()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": ADMISSION_ENABLED,
+            "active": self.limiter.active,
+            "waiting": self.limiter.waiting,
+            "max_concurrent": self.limiter.limit,
+            "rate_per_minute": self.rate_per_second * 60,
+            "burst": self.burst,
+        }
+
+
+def client_id(http_request, api_key: Optional[str] = None) -> str:
+    """Rate-limit identity: the user's own key when they bring one, else the source IP."""
+    if api_key:
+        from .chain_pool import api_key_hash
+        return "key:" + api_key_hash(api_key)
+    client = http_request.client
+    return "ip:" + (client.host if client else "unknown")
+
+
+def _load_backend() -> Optional[RateLimitBackend]:
+    if not ADMISSION_BACKEND:
+        return None
+    module_name, _, attr = ADMISSION_BACKEND.partition(":")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+_admission = None
+
+
+def get_admission() -> AdmissionController:
+    """Process-wide controller, built from the environment on first use."""
+    global _admission
+    if _admission is None:
+        _admission = AdmissionController(backend=_load_backend())
+    return _admission
+
+
+@asynccontextmanager
+async def admit(http_request, route: str, api_key: Optional[str] = None, cost: float = 1):
+    """Admission for one request taking `cost` rate-limit tokens; a no-op with ADMISSION_ENABLED=false."""
+    if not ADMISSION_ENABLED:
+        yield
+        return
+    async with get_admission().admit(client_id(http_request, api_key), route, cost):
+        yield
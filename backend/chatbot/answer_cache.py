@@ -0,0 +1,109 @@
+"""Semantic answer cache that sits in front of the RetrievalQA chain."""
+import os
+import re
+import threading
+from typing import List, Optional
+
+from .cache import LRUCache
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_MAXSIZE = int(os.getenv("ANSWER_CACHE_MAXSIZE", "512"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "86400"))
+# Cosine similarity needed for a near-repeat question to reuse a cached answer.
+# Set to 0 to disable the embedding lookup and only serve exact (normalized) repeats.
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so trivial variants share a key."""
+    question = re.sub(r"[^\w\s]", " ", question.lower())
+    return " ".join(question.split())
+
+
+class CachedAnswer:
+    """Answer body (without the per-request model note) and its source paths."""
+
+    def __init__(self, answer: str, sources: List[str], embedding=None):
+        self.answer = answer
+        self.sources = sources
+        self.embedding = embedding
+
+
+class AnswerCache:
+    """LRU/TTL answer cache with exact and embedding-similarity hit modes.
+
+    The cache is tied to an index version; when the FAISS index is rebuilt the
+    version changes and every cached answer is dropped.
+    """
+
+    def __init__(self, maxsize: int = ANSWER_CACHE_MAXSIZE, ttl: float = ANSWER_CACHE_TTL,
+                 similarity_threshold: float = ANSWER_CACHE_SIMILARITY):
+        self._entries = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.similarity_threshold = similarity_threshold
+        self.semantic_hits = 0
+        self._version = None
+        self._lock = threading.Lock()
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.similarity_threshold > 0
+
+    def check_version(self, version):
+        """Drop all entries if the index version differs from the one they were built against."""
+        with self._lock:
+            if version != self._version:
+                if self._version is not None:
+                    print(f"Index version changed ({self._version} -> {version}), clearing answer cache")
+                self._entries.clear()
+                self._version = version
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def get_exact(self, question: str) -> Optional[CachedAnswer]:
+        return self._entries.get(normalize_question(question))
+
+    def get_similar(self, embedding) -> Optional[CachedAnswer]:
+        """Return the closest cached answer whose question embedding clears the threshold."""
+        if not self.semantic_enabled:
+            return None
+        import numpy as np
+
+        candidates = [entry for _, entry in self._entries.items() if entry.embedding is not None]
+        if not candidates:
+            return None
+        query = np.asarray(embedding, dtype=np.float32)
+        matrix = np.asarray([entry.embedding for entry in candidates], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+        scores = matrix @ query / np.where(norms == 0, 1.0, norms)
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+        self.semantic_hits += 1
+        return candidates[best]
+
+    def set(self, question: str, answer: str, sources: List[str], embedding=None):
+        # Before check_version (or right after invalidate) the answer's index is unknown; don't keep it
+        if self._version is None:
+            return
+        self._entries.set(normalize_question(question), CachedAnswer(answer, sources, embedding))
+
+    def stats(self) -> dict:
+        stats = self._entries.stats()
+        stats["semantic_hits"] = self.semantic_hits
+        stats["similarity_threshold"] = self.similarity_threshold
+        stats["index_version"] = self._version
+        return stats
+
+
+_answer_cache = None
+
+
+def get_answer_cache() -> AnswerCache:
+    """Process-wide answer cache shared by /ask and the index rebuild."""
+    global _answer_cache
+    if _answer_cache is None:
+        _answer_cache = AnswerCache()
+    return _answer_cache
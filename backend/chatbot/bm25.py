@@ -0,0 +1,247 @@
+"""BM25 keyword index over the FAISS rows, reciprocal rank fusion and the keyword fast path.
+
+The index is built by every rebuild from the documents already in the vectorstore
+and saved as bm25.json next to it, keyed by FAISS row position so keyword and
+vector hits can be fused without touching the docstore. Questions that are pure
+lookups of rare names ("ManaBurn", "Wells Fargo") are answered from BM25 alone
+and skip the query embedding round-trip. Rarity alone isn't enough: in a corpus
+of a few hundred chunks ordinary words like "education" or "weaknesses" are
+rare too, and those questions need the vector search and relevance threshold.
+So a term only qualifies when the corpus writes it as a proper noun.
+"""
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .metrics import stage
+
+HYBRID_RETRIEVAL = os.getenv("HYBRID_RETRIEVAL", "true").lower() == "true"
+# Skip the embedding when the question has at most this many terms and each one is a rare name:
+# in at most MAX_DOCS chunks and MAX_DF of all chunks
+BM25_FAST_PATH_MAX_TERMS = int(os.getenv("BM25_FAST_PATH_MAX_TERMS", "3"))
+BM25_FAST_PATH_MAX_DOCS = int(os.getenv("BM25_FAST_PATH_MAX_DOCS", "20"))
+BM25_FAST_PATH_MAX_DF = float(os.getenv("BM25_FAST_PATH_MAX_DF", "0.1"))
+# A term is a name when at least this share of its mid-sentence occurrences are capitalized
+NAME_MIN_CAPITALIZED = 0.75
+NAME_MIN_OCCURRENCES = 3
+# Candidates taken from each ranking before fusion
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))
+RRF_K = 60
+
+BM25_FILE = "bm25.json"
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[.+#][a-z0-9]+)*[+#]*")
+# Same tokens on the original text, to see how they are capitalized
+_CASED_TOKEN = re.compile(r"[A-Za-z0-9]+(?:[.+#][A-Za-z0-9]+)*[+#]*")
+# A capital after these (or at the start) is sentence or list capitalization, not a name
+_SENTENCE_START = frozenset(".!?:;\n#-*|>•")
+# Lines, table cells and HTML elements are checked for title case separately; URLs are skipped
+_SEGMENT_BREAK = re.compile(r"\n|\||<[^>]*>|\S+://\S+|\S*/\S*")
+STOPWORDS = frozenset("""
+a about after all also am an and any are as at be been but by can could did do does
+doing for from had has have how i if in into is it its me more most my no not of on
+or our please so some tell than that the their them then there these they this those
+to tc tc's us was we were what when where which who why will with would you your
+""".split())
+
+Hit = Tuple[int, float]
+# (position, vector relevance); relevance is None for chunks found by keywords only
+ScoredHit = Tuple[int, Optional[float]]
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def find_names(texts: List[str]) -> List[str]:
+    """Terms the texts write as proper nouns: capitalized in most mid-sentence occurrences.
+
+    Title-case lines and table cells (headings like "Threadpool Basics") are
+    skipped, since every word in them is capitalized.
+    """
+    capitalized, occurrences = Counter(), Counter()
+    for line in (line for text in texts for line in _SEGMENT_BREAK.split(text)):
+        matches = list(_CASED_TOKEN.finditer(line))
+        words = [match.group() for match in matches if match.group()[0].isalpha()]
+        if words and all(word[0].isupper() for word in words):
+            continue
+        for match in matches:
+            term = match.group().lower()
+            if term in STOPWORDS:
+                continue
+            before = line[:match.start()].rstrip(" \t\"'([_")
+            if not before or before[-1] in _SENTENCE_START:
+                continue
+            occurrences[term] += 1
+            if match.group()[0].isupper():
+                capitalized[term] += 1
+    return sorted(term for term, count in occurrences.items()
+                  if count >= NAME_MIN_OCCURRENCES and capitalized[term] / count >= NAME_MIN_CAPITALIZED)
+
+
+class BM25Index:
+    """Okapi BM25 over documents identified by FAISS row position."""
+
+    def __init__(self, postings: Dict[str, List[List[int]]], doc_lengths: List[int], names: List[str] = ()):
+        # term -> [[position, term frequency], ...]
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        # Terms eligible for the fast path (see find_names)
+        self.names = frozenset(names)
+        self.avg_length = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0
+
+    @classmethod
+    def build(cls, texts: List[str]) -> "BM25Index":
+        postings = {}
+        doc_lengths = []
+        for position, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, []).append([position, tf])
+        return cls(postings, doc_lengths, find_names(texts))
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore) -> "BM25Index":
+        """Index every document of a LangChain FAISS store, in row order."""
+        ids = vectorstore.index_to_docstore_id
+        texts = []
+        for position in range(vectorstore.index.ntotal):
+            doc = vectorstore.docstore.search(ids[position])
+            heading = doc.metadata.get("heading", "") if hasattr(doc, "metadata") else ""
+            texts.append(f"{heading}\n{getattr(doc, 'page_content', '')}")
+        return cls.build(texts)
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def save(self, index_path: str):
+        path = os.path.join(index_path, BM25_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"postings": self.postings, "doc_lengths": self.doc_lengths, "names": sorted(self.names)},
+                      f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, index_path: str) -> Optional["BM25Index"]:
+        try:
+            with open(os.path.join(index_path, BM25_FILE), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if "names" not in data:
+            # Written before names were tracked; rebuilding it in memory restores the fast path
+            return None
+        return cls(data["postings"], data["doc_lengths"], data["names"])
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self) - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = HYBRID_CANDIDATES) -> List[Hit]:
+        """Top-k (position, BM25 score) pairs, best first."""
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for position, tf in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[position] / (self.avg_length or 1))
+                scores[position] = scores.get(position, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda hit: (-hit[1], hit[0]))[:k]
+
+    def fast_path(self, query: str, k: int) -> Optional[List[Hit]]:
+        """BM25 hits when the keywords alone are decisive, otherwise None.
+
+        Decisive means a short question whose every term is a name in the corpus
+        and rare (in at most BM25_FAST_PATH_MAX_DOCS chunks and at most
+        BM25_FAST_PATH_MAX_DF of them); only chunks containing all of the terms
+        are returned.
+        """
+        terms = set(tokenize(query))
+        if not terms or len(terms) > BM25_FAST_PATH_MAX_TERMS or not len(self):
+            return None
+        matching = None
+        for term in terms:
+            if term not in self.names:
+                return None
+            positions = {position for position, _ in self.postings.get(term, ())}
+            if (not positions or len(positions) > BM25_FAST_PATH_MAX_DOCS
+                    or len(positions) / len(self) > BM25_FAST_PATH_MAX_DF):
+                return None
+            matching = positions if matching is None else matching & positions
+        hits = [hit for hit in self.search(query, len(self)) if hit[0] in matching][:k]
+        return hits or None
+
+
+def reciprocal_rank_fusion(rankings: List[List[Hit]], k: int = RRF_K) -> List[Hit]:
+    """Fuse ranked lists of (position, score) by summing 1 / (k + rank)."""
+    fused = {}
+    for ranking in rankings:
+        for rank, (position, _) in enumerate(ranking, start=1):
+            fused[position] = fused.get(position, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda hit: (-hit[1], hit[0]))
+
+
+def hybrid_search(bm25: Optional[BM25Index], question: str, vector_search: Callable[[str, int], List[Hit]],
+                  k: int) -> List[ScoredHit]:
+    """Top-k chunks: BM25 alone when decisive, else BM25 and vector hits fused.
+
+    vector_search(question, n) embeds the question and returns up to n hits that
+    clear the relevance threshold. Keyword hits only join the context when at
+    least one vector hit cleared it; otherwise the result is empty, which lets
+    callers answer without an LLM call.
+    """
+    if bm25 is None:
+        return vector_search(question, k)
+    with stage("bm25"):
+        fast = bm25.fast_path(question, k)
+    if fast is not None:
+        return [(position, None) for position, _ in fast]
+    return _fuse(bm25, question, vector_search(question, HYBRID_CANDIDATES), k)
+
+
+async def ahybrid_search(bm25: Optional[BM25Index], question: str, avector_search, k: int) -> List[ScoredHit]:
+    """Async hybrid_search; avector_search is a coroutine function."""
+    if bm25 is None:
+        return await avector_search(question, k)
+    with stage("bm25"):
+        fast = bm25.fast_path(question, k)
+    if fast is not None:
+        return [(position, None) for position, _ in fast]
+    return _fuse(bm25, question, await avector_search(question, HYBRID_CANDIDATES), k)
+
+
+async def ahybrid_search_batch(bm25: Optional[BM25Index], questions: List[str], aembed_many,
+                               search_many, k: int) -> List[List[ScoredHit]]:
+    """hybrid_search for many questions with one embeddings call and one matrix search.
+
+    aembed_many(questions) returns one vector per question; search_many(vectors, n)
+    returns one hit list per vector. Fast-path questions are left out of both.
+    """
+    n = k if bm25 is None else HYBRID_CANDIDATES
+    with stage("bm25"):
+        needs_vectors = [question for question in dict.fromkeys(questions)
+                         if bm25 is None or bm25.fast_path(question, k) is None]
+    vector_hits = {}
+    if needs_vectors:
+        vectors = await aembed_many(needs_vectors)
+        vector_hits = dict(zip(needs_vectors, search_many(vectors, n)))
+    return [hybrid_search(bm25, question, lambda q, _: vector_hits[q], k) for question in questions]
+
+
+def _fuse(bm25: BM25Index, question: str, vector_hits: List[Hit], k: int) -> List[ScoredHit]:
+    if not vector_hits:
+        return []
+    with stage("bm25"):
+        relevance = dict(vector_hits)
+        keyword_hits = bm25.search(question, HYBRID_CANDIDATES)
+        return [(position, relevance.get(position))
+                for position, _ in reciprocal_rank_fusion([vector_hits, keyword_hits])[:k]]
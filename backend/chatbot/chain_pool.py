@@ -0,0 +1,38 @@
+"""Bounded, TTL-evicted pool of QA chains for bring-your-own-key requests."""
+import hashlib
+import os
+
+from .cache import LRUCache
+
+QA_CHAIN_POOL_SIZE = int(os.getenv("QA_CHAIN_POOL_SIZE", "64"))
+QA_CHAIN_POOL_TTL = float(os.getenv("QA_CHAIN_POOL_TTL", "1800"))
+
+
+def api_key_hash(api_key: str) -> str:
+    """Stable identifier for an API key that never exposes the key itself."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+class QAChainPool:
+    """LRU/TTL pool of chains keyed by a hash of the user's API key."""
+
+    def __init__(self, maxsize: int = QA_CHAIN_POOL_SIZE, ttl: float = QA_CHAIN_POOL_TTL):
+        self._chains = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, api_key: str, factory, scope=None):
+        """Return the pooled chain for this key, building it with factory(api_key) on a miss.
+
+        A chain built under a different `scope` (the index snapshot it is bound to) counts as a miss.
+        """
+        key = api_key_hash(api_key)
+        entry = self._chains.get(key)
+        if entry is None or entry[0] is not scope:
+            entry = (scope, factory(api_key))
+            self._chains.set(key, entry)
+        return entry[1]
+
+    def clear(self):
+        self._chains.clear()
+
+    def stats(self) -> dict:
+        return self._chains.stats()
@@ -0,0 +1,155 @@
+"""MDX-aware, token-budgeted chunking of content documents before embedding."""
+import os
+import re
+from typing import List, Tuple
+
+from langchain_core.documents import Document
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", "400"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "50"))
+ENCODING_NAME = "cl100k_base"  # Tokenizer used by text-embedding-ada-002 / text-embedding-3-*
+
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+FENCE_RE = re.compile(r'^\s*(```|~~~)')
+
+_encoding = None
+_encoding_failed = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is None and tiktoken is not None and not _encoding_failed:
+        try:
+            _encoding = tiktoken.get_encoding(ENCODING_NAME)
+        except Exception as e:
+            # The BPE file is downloaded on first use; fall back to estimates when offline
+            print(f"tiktoken encoding unavailable, estimating token counts: {e}")
+            _encoding_failed = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken, or a ~4 characters/token estimate if it is not installed."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return max(1, len(text) // 4) if text else 0
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _split_tokens(text: str, size: int, overlap: int) -> List[str]:
+    """Split text into windows of at most `size` tokens, each overlapping the previous one."""
+    encoding = _get_encoding()
+    step = max(1, size - overlap)
+    if encoding is None:
+        char_size, char_step = size * 4, step * 4
+        return [text[i:i + char_size] for i in range(0, max(1, len(text) - char_size + char_step), char_step)]
+    tokens = encoding.encode(text, disallowed_special=())
+    return [encoding.decode(tokens[i:i + size]) for i in range(0, max(1, len(tokens) - size + step), step)]
+
+
+def _tail_tokens(text: str, count: int) -> str:
+    if count <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[-count * 4:]
+    tokens = encoding.encode(text, disallowed_special=())
+    return encoding.decode(tokens[-count:]) if len(tokens) > count else text
+
+
+def heading_anchor(heading: str) -> str:
+    """Slug matching the heading ids Astro generates (github-slugger rules)."""
+    slug = heading.strip().lower()
+    slug = re.sub(r'[`*_~\[\]()]', '', slug)
+    slug = re.sub(r'[^\w\- ]', '', slug)
+    return slug.replace(' ', '-')
+
+
+def split_sections(text: str) -> List[Tuple[str, List[str]]]:
+    """Split markdown into (heading, paragraphs) sections.
+
+    Headings and blank lines inside fenced code blocks are ignored so a code
+    sample is never split across paragraphs.
+    """
+    sections = [("", [])]
+    paragraph = []
+    in_fence = False
+
+    def flush():
+        if paragraph:
+            sections[-1][1].append("\n".join(paragraph).strip())
+            paragraph.clear()
+
+    for line in text.splitlines():
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+            paragraph.append(line)
+            continue
+        if not in_fence:
+            heading = HEADING_RE.match(line)
+            if heading:
+                flush()
+                sections.append((heading.group(2).strip(), [line.strip()]))
+                continue
+            if not line.strip():
+                flush()
+                continue
+        paragraph.append(line)
+    flush()
+    return [(heading, [p for p in paragraphs if p]) for heading, paragraphs in sections if any(paragraphs)]
+
+
+def chunk_text(text: str, chunk_tokens: int = CHUNK_TOKENS,
+               overlap_tokens: int = CHUNK_OVERLAP_TOKENS) -> List[Tuple[str, str]]:
+    """Pack paragraphs into (heading, chunk) pairs of at most `chunk_tokens` tokens.
+
+    Chunks never span two sections. Consecutive chunks of the same section share
+    `overlap_tokens` tokens so a sentence cut at a boundary keeps its context.
+    """
+    chunks = []
+    for heading, paragraphs in split_sections(text):
+        current, current_tokens = [], 0
+        for paragraph in paragraphs:
+            tokens = count_tokens(paragraph)
+            if tokens > chunk_tokens:
+                # Oversized paragraph (long list, code block, PDF page) - split by tokens,
+                # keeping any pending lead-in such as the heading line with it
+                windows = _split_tokens("\n\n".join(current + [paragraph]), chunk_tokens, overlap_tokens)
+                chunks.extend((heading, window) for window in windows[:-1])
+                current, current_tokens = [windows[-1]], count_tokens(windows[-1])
+                continue
+            if current and current_tokens + tokens > chunk_tokens:
+                chunk = "\n\n".join(current)
+                chunks.append((heading, chunk))
+                overlap = _tail_tokens(chunk, overlap_tokens)
+                overlap_count = count_tokens(overlap) if overlap else 0
+                if overlap and overlap_count + tokens <= chunk_tokens:
+                    current, current_tokens = [overlap], overlap_count
+                else:
+                    current, current_tokens = [], 0
+            current.append(paragraph)
+            current_tokens += tokens
+        if current:
+            chunks.append((heading, "\n\n".join(current)))
+    return chunks
+
+
+def chunk_documents(documents: List[Document], chunk_tokens: int = CHUNK_TOKENS,
+                    overlap_tokens: int = CHUNK_OVERLAP_TOKENS) -> List[Document]:
+    """Chunking stage of the ingest pipeline: one Document per chunk, with heading/anchor metadata."""
+    chunked = []
+    for doc in documents:
+        for index, (heading, text) in enumerate(chunk_text(doc.page_content, chunk_tokens, overlap_tokens)):
+            metadata = dict(doc.metadata)
+            metadata.update({
+                'chunk': index,
+                'heading': heading,
+                'anchor': heading_anchor(heading) if heading else '',
+                'tokens': count_tokens(text),
+            })
+            chunked.append(Document(page_content=text, metadata=metadata))
+    return chunked
@@ -0,0 +1,69 @@
+"""Single-flight coalescing: concurrent identical requests share one in-flight computation.
+
+When a post gets shared, the same question arrives many times within a second,
+before the first answer reaches the answer cache. SingleFlight runs the first
+request (the leader) as a task; duplicates with the same key that arrive while
+it is running (followers) await that task instead of retrieving and calling the
+model themselves. The task is shielded, so a leader that disconnects doesn't
+cancel the followers' answer.
+
+State is per process and per event loop; on Lambda, where a container serves
+one invocation at a time, nothing is ever coalesced.
+"""
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from .metrics import Counter
+
+COALESCE_ENABLED = os.getenv("COALESCE_ENABLED", "true").lower() == "true"
+
+REQUESTS = Counter("chatbot_coalesced_requests_total", "Requests by single-flight role (leader ran it, follower shared it)",
+                   ("route", "role"))
+CALLS_SAVED = Counter("chatbot_coalesced_openai_calls_saved_total",
+                      "OpenAI calls followers didn't make because they shared a leader's result", ("route",))
+
+
+class SingleFlight:
+    """Map of key -> running task; run() joins the task for its key or starts one."""
+
+    def __init__(self, route: str):
+        self.route = route
+        self._inflight: Dict[Any, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.calls_saved = 0
+
+    async def run(self, key, factory: Callable[[], Awaitable]) -> Tuple[Any, bool]:
+        """Return (result, shared); shared is True when another request computed it."""
+        task = self._inflight.get(key)
+        # Tasks can't be awaited from another event loop (e.g. Mangum's, next to a test's)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.followers += 1
+            REQUESTS.inc(route=self.route, role="follower")
+            return await asyncio.shield(task), True
+
+        # The task copies this request's context, so its usage and timings go to the leader
+        task = asyncio.ensure_future(factory())
+        self._inflight[key] = task
+        task.add_done_callback(lambda finished: self._forget(key, finished))
+        self.leaders += 1
+        REQUESTS.inc(route=self.route, role="leader")
+        return await asyncio.shield(task), False
+
+    def _forget(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def record_saved_calls(self, calls: int):
+        self.calls_saved += calls
+        CALLS_SAVED.inc(calls, route=self.route)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": COALESCE_ENABLED,
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "openai_calls_saved": self.calls_saved,
+        }
@@ -1,4 +1,8 @@
 """Confidence scoring for chatbot responses."""
+from .retrieval import RELEVANCE_THRESHOLD
+
+# Cosine similarity at which the best source earns all of the relevance points
+STRONG_RELEVANCE = 0.9
 
 def calculate_confidence_score(sources, question: str) -> tuple[str, str]:
     """Calculate confidence score based on source quality and question specificity."""
@@ -33,9 +37,8 @@ def calculate_confidence_score(sources, question: str) -> tuple[str, str]:
     elif specific_matches >= 1:
         score += 15
     
-    # Source relevance factor (0-30 points) 
-    # This is simplified - in practice you'd check similarity scores
-    score += min(30, num_sources * 10)
+    # Source relevance factor (0-30 points) from the retriever's similarity scores
+    score += _relevance_points(sources)
     
     # Determine confidence level and explanation
     if score >= 75:
@@ -51,4 +54,20 @@ def calculate_confidence_score(sources, question: str) -> tuple[str, str]:
         level = "Low"
         explanation = "Few sources or very general question"
     
-    return level, explanation
\ No newline at end of file
+    return level, explanation
+
+
+def _relevance_points(sources) -> int:
+    """0-30 points scaled from the best relevance_score between the threshold and STRONG_RELEVANCE.
+
+    Keyword fast-path hits carry no score and count as fairly strong matches;
+    documents without metadata fall back to counting sources.
+    """
+    scores = [doc.metadata.get("relevance_score") for doc in sources if hasattr(doc, "metadata")]
+    if not scores:
+        return min(30, len(sources) * 10)
+    vector_scores = [s for s in scores if s is not None]
+    if not vector_scores:
+        return 20
+    strength = (max(vector_scores) - RELEVANCE_THRESHOLD) / (STRONG_RELEVANCE - RELEVANCE_THRESHOLD)
+    return round(30 * min(1.0, max(0.0, strength)))
\ No newline at end of file
@@ -4,6 +4,8 @@ import datetime
 import json
 from typing import List, Dict
 from langchain_core.documents import Document
+from .chunking import chunk_documents, count_tokens
+from .mdx_text import mdx_to_text
 try:
     import markdown
 except ImportError:
@@ -32,12 +34,14 @@ def update_last_rebuild_time():
         json.dump({'last_rebuild': now}, f)
 
 
-def extract_text_from_md(filepath: str) -> str:
+def read_md(filepath: str) -> str:
     with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-    # Optionally strip frontmatter and MDX components here
-    # For now, just return the raw text
-    return content
+        return f.read()
+
+
+def extract_text_from_md(filepath: str) -> str:
+    text, _ = mdx_to_text(read_md(filepath))
+    return text
 
 
 def extract_text_from_pdf(filepath: str) -> str:
@@ -51,40 +55,53 @@ def extract_text_from_pdf(filepath: str) -> str:
     return text
 
 
-def find_new_content_files(since: datetime.datetime) -> List[Dict]:
+def list_content_files() -> List[Dict]:
     exts = ['md', 'mdx', 'pdf']
     files = []
     for ext in exts:
         pattern = os.path.join(CONTENT_DIR, f'**/*.{ext}')
         for filepath in glob.glob(pattern, recursive=True):
             mtime = datetime.datetime.fromtimestamp(os.path.getmtime(filepath))
-            if mtime > since:
-                files.append({'path': filepath, 'ext': ext, 'mtime': mtime})
+            files.append({'path': filepath, 'ext': ext, 'mtime': mtime})
     return files
 
 
-def load_documents_for_embedding() -> List[Document]:
-    last_rebuild = get_last_rebuild_time()
+def find_new_content_files(since: datetime.datetime) -> List[Dict]:
+    return [file for file in list_content_files() if file['mtime'] > since]
+
+
+def load_documents_for_embedding(since: datetime.datetime = None) -> List[Document]:
+    last_rebuild = get_last_rebuild_time() if since is None else since
     files = find_new_content_files(last_rebuild)
     documents = []
+    raw_total, text_total = 0, 0
     for file in files:
+        fields = {}
         if file['ext'] in ['md', 'mdx']:
-            text = extract_text_from_md(file['path'])
+            raw = read_md(file['path'])
+            text, fields = mdx_to_text(raw)
+            # Frontmatter and markup tokens would otherwise be paid for on every query
+            raw_tokens, text_tokens = count_tokens(raw), count_tokens(text)
+            raw_total += raw_tokens
+            text_total += text_tokens
+            print(f"{os.path.relpath(file['path'], CONTENT_DIR)}: {raw_tokens} -> {text_tokens} tokens "
+                  f"({raw_tokens - text_tokens} saved)")
         elif file['ext'] == 'pdf':
             text = extract_text_from_pdf(file['path'])
         else:
             continue
-        documents.append(
-            Document(
-                page_content=text,
-                metadata={
-                    'source': file['path'],
-                    'type': file['ext'],
-                    'modified': file['mtime'].isoformat()
-                }
-            )
-        )
-    return documents
+        metadata = {
+            'source': file['path'],
+            'type': file['ext'],
+            'modified': file['mtime'].isoformat()
+        }
+        metadata.update(fields)
+        documents.append(Document(page_content=text, metadata=metadata))
+    if raw_total:
+        print(f"Markup stripping saved {raw_total - text_total} of {raw_total} tokens "
+              f"({100 * (raw_total - text_total) / raw_total:.1f}%)")
+    # Embed heading/paragraph aligned chunks rather than whole files
+    return chunk_documents(documents)
 
 # Example usage:
 if __name__ == '__main__':
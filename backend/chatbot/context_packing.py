@@ -0,0 +1,115 @@
+"""Context packing between retrieval and the prompt: MMR de-duplication, then a token budget.
+
+Retrievers fetch CONTEXT_FETCH_K candidates. Maximal marginal relevance picks
+up to k of them, trading relevance against similarity to chunks already picked,
+so overlapping chunks of the same section don't all make it in. The picks then
+fill CONTEXT_TOKEN_BUDGET greedily; a chunk that doesn't fit is cut at the last
+sentence boundary that does.
+"""
+import os
+import re
+from typing import List
+
+CONTEXT_PACKING = os.getenv("CONTEXT_PACKING", "true").lower() == "true"
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+CONTEXT_FETCH_K = int(os.getenv("CONTEXT_FETCH_K", "10"))
+# 1.0 ranks by relevance only, 0.0 by diversity only
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.7"))
+# Don't bother adding a trimmed chunk shorter than this
+MIN_TRIMMED_TOKENS = 40
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n{2,}")
+
+
+def mmr_select(relevance, vectors, k: int, lambda_mult: float = MMR_LAMBDA) -> List[int]:
+    """Indices of up to k rows picked by maximal marginal relevance, in pick order."""
+    import numpy as np
+    count = len(relevance)
+    if count == 0 or k <= 0:
+        return []
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    similarity = vectors @ vectors.T
+    selected = [int(np.argmax(relevance))]
+    # Highest similarity of each candidate to anything picked so far
+    redundancy = similarity[selected[0]].copy()
+    available = np.ones(count, dtype=bool)
+    available[selected[0]] = False
+    while len(selected) < min(k, count):
+        scores = np.where(available, lambda_mult * relevance - (1 - lambda_mult) * redundancy, -np.inf)
+        pick = int(np.argmax(scores))
+        selected.append(pick)
+        available[pick] = False
+        np.maximum(redundancy, similarity[pick], out=redundancy)
+    return selected
+
+
+def _relevance(docs):
+    """Retrieval scores when every chunk has one, otherwise scores decaying with retrieval rank."""
+    import numpy as np
+    scores = [doc.metadata.get("relevance_score") for doc in docs]
+    if all(score is not None for score in scores):
+        return np.asarray(scores, dtype=np.float32)
+    return np.linspace(1.0, 0.5, num=len(docs), dtype=np.float32)
+
+
+def count_tokens(text: str) -> int:
+    # chunking imports langchain_core, which LeanQA otherwise never loads
+    from .chunking import count_tokens as count
+    return count(text)
+
+
+def _doc_tokens(doc) -> int:
+    # Chunks record their size at ingest; only trimmed or legacy documents are re-counted
+    tokens = doc.metadata.get("tokens")
+    return tokens if isinstance(tokens, int) else count_tokens(doc.page_content)
+
+
+def trim_to_tokens(text: str, budget: int) -> str:
+    """Longest prefix of whole sentences within `budget` tokens ("" if the first doesn't fit)."""
+    kept = ""
+    ends = [match.start() for match in _SENTENCE_END.finditer(text)] + [len(text)]
+    for end in ends:
+        candidate = text[:end]
+        if count_tokens(candidate) > budget:
+            break
+        kept = candidate
+    return kept.rstrip()
+
+
+def fetch_k(k: int) -> int:
+    """Candidates a retriever should fetch to end up with k packed documents."""
+    return max(k, CONTEXT_FETCH_K) if CONTEXT_PACKING else k
+
+
+def pack_context(docs, vectors, k: int, budget: int = CONTEXT_TOKEN_BUDGET) -> list:
+    """Pick up to k diverse documents from `docs` (best first) and fit them into `budget` tokens.
+
+    `vectors` holds one embedding per document. Prints the tokens saved against
+    stuffing the top k in full.
+    """
+    import numpy as np
+
+    if not CONTEXT_PACKING or not docs:
+        return docs[:k]
+    order = mmr_select(_relevance(docs), np.asarray(vectors, dtype=np.float32), k)
+    packed, used = [], 0
+    for index in order:
+        doc = docs[index]
+        tokens = _doc_tokens(doc)
+        if used + tokens <= budget:
+            packed.append(doc)
+            used += tokens
+            continue
+        remaining = budget - used
+        if remaining >= MIN_TRIMMED_TOKENS:
+            text = trim_to_tokens(doc.page_content, remaining)
+            if text:
+                tokens = count_tokens(text)
+                packed.append(doc.model_copy(update={
+                    "page_content": text, "metadata": {**doc.metadata, "tokens": tokens, "trimmed": True}
+                }))
+                used += tokens
+    baseline = sum(_doc_tokens(doc) for doc in docs[:k])
+    print(f"Context packing: {len(packed)}/{len(docs)} chunks, {used} tokens "
+          f"({baseline - used} saved vs top {k} in full)")
+    return packed
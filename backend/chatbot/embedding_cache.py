@@ -0,0 +1,117 @@
+"""Persistent content-hash keyed embedding cache for index rebuilds."""
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# Next to the package, not in it: the Dockerfile copies chatbot/ into the Lambda image
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "embedding_cache.sqlite3")
+)
+# Where the cache used to live by default; moved on first use
+_LEGACY_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "embedding_cache.sqlite3")
+
+
+def embedding_key(model: str, text: str, dimensions: int = None) -> str:
+    """Cache key for a chunk of text embedded with a given model and output size.
+
+    Without dimensions (the model's native size) the key is the same as before
+    dimensions were part of it, so existing caches stay valid.
+    """
+    if dimensions:
+        model = f"{model}\0{dimensions}"
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """SQLite-backed map of embedding key -> float32 vector."""
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH):
+        if path == EMBEDDING_CACHE_PATH and not os.path.exists(path) and os.path.exists(_LEGACY_CACHE_PATH):
+            print(f"Moving the embedding cache out of the package to {path}")
+            os.replace(_LEGACY_CACHE_PATH, path)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> dict:
+        found = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, items: dict):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items()]
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only calls the underlying model for text it has never seen.
+
+    Keys combine the embedding model name (and `dimensions`, when set) with a hash
+    of the chunk text, so a touched-but-unchanged file or a fresh checkout costs
+    nothing to re-embed.
+    """
+
+    def __init__(self, underlying: Embeddings, store: EmbeddingStore = None, model: str = None,
+                 dimensions: int = None):
+        self.underlying = underlying
+        self.store = store or EmbeddingStore()
+        self.model = model or getattr(underlying, "model", type(underlying).__name__)
+        self.dimensions = dimensions or getattr(underlying, "dimensions", None)
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self.key(text) for text in texts]
+        cached = self.store.get_many(list(set(keys)))
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+        self.hits += len(texts) - sum(1 for key in keys if key in missing)
+        self.misses += len(missing)
+        if missing:
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            # Round-trip through float32 so fresh and cached vectors are identical
+            fresh = {
+                key: np.asarray(vector, dtype=np.float32).tolist()
+                for key, vector in zip(missing.keys(), vectors)
+            }
+            self.store.put_many(fresh)
+            cached.update(fresh)
+        return [cached[key] for key in keys]
+
+    def key(self, text: str) -> str:
+        return embedding_key(self.model, text, self.dimensions)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.underlying.embed_query(text)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
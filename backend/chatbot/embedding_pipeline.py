@@ -0,0 +1,106 @@
+"""Batched, concurrent, rate-limit-aware embedding of documents for index rebuilds."""
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List
+
+from .embedding_cache import CachedEmbeddings
+from .usage import record_embedding
+
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "6"))
+EMBED_BACKOFF_BASE = float(os.getenv("EMBED_BACKOFF_BASE", "1.0"))
+EMBED_BACKOFF_MAX = float(os.getenv("EMBED_BACKOFF_MAX", "60"))
+
+
+def _status_code(error: Exception):
+    return getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    return _status_code(error) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """What the OpenAI SDK itself retries: 408, 409, 429, 5xx, timeouts and dropped connections."""
+    import openai
+
+    # APITimeoutError is an APIConnectionError
+    if isinstance(error, openai.APIConnectionError) or is_rate_limit_error(error):
+        return True
+    status = _status_code(error)
+    return status in (408, 409) or (status is not None and status >= 500)
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Honor Retry-After when the API sends it, otherwise exponential backoff with jitter."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        delay = min(EMBED_BACKOFF_MAX, EMBED_BACKOFF_BASE * 2 ** attempt)
+        return delay * (0.5 + random.random() / 2)
+
+
+def embed_batch_with_backoff(embeddings, texts: List[str], max_retries: int = EMBED_MAX_RETRIES):
+    """Embed one batch, backing off and retrying on 429s, 5xx and connection errors.
+
+    The embeddings client is built with max_retries=0, so this is the only retry layer.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return embeddings.embed_documents(texts)
+        except Exception as e:
+            if not is_retryable_error(e) or attempt == max_retries:
+                raise
+            delay = _retry_delay(e, attempt)
+            reason = "Rate limited" if is_rate_limit_error(e) else type(e).__name__
+            print(f"{reason} embedding {len(texts)} texts, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def embed_texts(texts: List[str], embeddings: CachedEmbeddings, batch_size: int = EMBED_BATCH_SIZE,
+                concurrency: int = EMBED_CONCURRENCY) -> List[List[float]]:
+    """Embed texts in batches over a bounded worker pool.
+
+    Every completed batch is written to the embedding cache immediately, so the
+    cache doubles as the checkpoint: an interrupted rebuild re-run only embeds
+    the batches that never finished.
+    """
+    keys = [embeddings.key(text) for text in texts]
+    done = embeddings.store.get_many(list(set(keys)))
+    pending = {}
+    for key, text in zip(keys, texts):
+        if key not in done:
+            pending.setdefault(key, text)
+    embeddings.hits += len(texts) - sum(1 for key in keys if key in pending)
+    embeddings.misses += len(pending)
+
+    pending_items = list(pending.items())
+    batches = [pending_items[i:i + batch_size] for i in range(0, len(pending_items), batch_size)]
+    if batches:
+        print(f"Embedding {len(pending_items)} uncached texts in {len(batches)} batches "
+              f"({concurrency} concurrent)...")
+
+    def run(batch):
+        texts = [text for _, text in batch]
+        vectors = embed_batch_with_backoff(embeddings.underlying, texts)
+        # Rebuilds run on the free-tier key; attribute them even outside a request
+        record_embedding("rebuild", embeddings, texts, key_class="free")
+        fresh = {key: vector for (key, _), vector in zip(batch, vectors)}
+        embeddings.store.put_many(fresh)
+        return fresh
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = [pool.submit(run, batch) for batch in batches]
+        for completed, future in enumerate(as_completed(futures), start=1):
+            done.update(future.result())
+            print(f"  batch {completed}/{len(batches)} checkpointed")
+
+    # Read back through the store so every vector has the same float32 precision
+    stored = embeddings.store.get_many(list(pending)) if pending else {}
+    done.update(stored)
+    return [done[key] for key in keys]
@@ -1,53 +1,107 @@
 """Content filtering functions for chatbot queries."""
 import re
+from typing import Iterable, List
+
+# Blocked topics/patterns - only block obviously unrelated content
+BLOCKED_PATTERNS = [
+    # Weather, news, general knowledge
+    r'\b(weather|news|current events|stock|price|recipe|joke|story)\b',
+    # Mathematical/computational requests not about work
+    r'\b(calculate|solve)\s+\d+|what is \d+',
+    # Code requests without context
+    r'write.*code|create.*function|generate.*script(?!.*tc|.*work|.*project)',
+]
+
+# Allowed topics/patterns about TC - be more permissive
+ALLOWED_PATTERNS = [
+    # Direct mentions (most important)
+    r'\b(tc|heiner|you|your)\b',
+    # Basic introduction questions
+    r'\b(tell me about|who is|who are you|about you|introduce)\b',
+    # Professional topics
+    r'\b(experience|work|job|career|project|skill|background|education|resume|cv)\b',
+    # Technical topics
+    r'\b(development|engineering|coding|programming|software|technical|ai|machine learning|data|architect)\b',
+    # Interview/hiring context
+    r'\b(hire|hiring|interview|candidate|qualification|position|role)\b',
+    # Generic professional questions
+    r'\b(what do you do|what is your)\b',
+    # Personality and cultural fit topics
+    r'\b(personality|character|traits|values|culture|cultural|fit|working style|work style|communication|collaborate|collaboration|team|leadership|manage|management)\b',
+    r'\b(motivation|motivated|drive|driven|passion|passionate|interest|interests|approach|philosophy|mindset|attitude)\b',
+    r'\b(problem.solving|decision.making|conflict|stress|pressure|challenge|adapt|adaptable|flexible|creativity|creative)\b',
+    r'\b(mentor|mentoring|learn|learning|grow|growth|feedback|improve|improvement|strengths|weaknesses|development)\b',
+    r'\b(behavior|behavioral|situation|situational|example|tell me about a time|describe a time|how do you|how would you)\b',
+]
+
+
+_WORD_LIST = re.compile(r"\\b\((?P<words>[a-z .|]+)\)\\b")
+
+
+def _trie_regex(words: List[str]) -> str:
+    """Alternation of `words` with shared prefixes factored out ('.' stays a wildcard).
+
+    Equivalent to '|'.join(words) for deciding whether a match exists, but the
+    engine compares each prefix once instead of once per word.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node) -> str:
+        branches = [(char if char == "." else re.escape(char)) + emit(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = "|".join(branches)
+        if "" in node:
+            return f"(?:{body})?"
+        return body if len(branches) == 1 else f"(?:{body})"
+
+    return emit(trie)
+
+
+def _combine(patterns: List[str]) -> str:
+    """One alternation for a pattern list; every \\b(word|...)\\b group shares one trie."""
+    words, others = [], []
+    for pattern in patterns:
+        match = _WORD_LIST.fullmatch(pattern)
+        if match:
+            words.extend(match.group("words").split("|"))
+        else:
+            others.append(f"(?:{pattern})")
+    if words:
+        others.insert(0, rf"\b(?:{_trie_regex(words)})\b")
+    return "|".join(others)
+
+
+# IGNORECASE is kept on the lowercased text: it also folds 'ı' and 'ſ' to 'i' and 's'
+_BLOCKED = re.compile(_combine(BLOCKED_PATTERNS), re.IGNORECASE)
+# Blocked alternatives come first, so at any position a blocked match wins
+_FILTER = re.compile(f"(?P<blocked>{_BLOCKED.pattern})|(?P<allowed>{_combine(ALLOWED_PATTERNS)})",
+                     re.IGNORECASE)
+
 
 def is_question_about_tc(question: str) -> bool:
     """
     Filter to ensure questions are about TC Heiner and his work experience.
     Prevents abuse of API key for unrelated questions.
+
+    Any blocked match rejects the question; otherwise it must match at least
+    one allowed pattern. One scan: the combined pattern stops at the first
+    match of either list, and if that is an allowed match only the blocked
+    alternatives are needed for the rest of the text.
     """
-    question_lower = question.lower()
-    
-    # Blocked topics/patterns - only block obviously unrelated content
-    blocked_patterns = [
-        # Weather, news, general knowledge
-        r'\b(weather|news|current events|stock|price|recipe|joke|story)\b',
-        # Mathematical/computational requests not about work
-        r'\b(calculate|solve)\s+\d+|what is \d+',
-        # Code requests without context
-        r'write.*code|create.*function|generate.*script(?!.*tc|.*work|.*project)',
-    ]
-    
-    # Check for blocked patterns
-    for pattern in blocked_patterns:
-        if re.search(pattern, question_lower, re.IGNORECASE):
-            return False
-    
-    # Allowed topics/patterns about TC - be more permissive
-    allowed_patterns = [
-        # Direct mentions (most important)
-        r'\b(tc|heiner|you|your)\b',
-        # Basic introduction questions
-        r'\b(tell me about|who is|who are you|about you|introduce)\b',
-        # Professional topics
-        r'\b(experience|work|job|career|project|skill|background|education|resume|cv)\b',
-        # Technical topics
-        r'\b(development|engineering|coding|programming|software|technical|ai|machine learning|data|architect)\b',
-        # Interview/hiring context
-        r'\b(hire|hiring|interview|candidate|qualification|position|role)\b',
-        # Generic professional questions
-        r'\b(what do you do|what is your)\b',
-        # Personality and cultural fit topics
-        r'\b(personality|character|traits|values|culture|cultural|fit|working style|work style|communication|collaborate|collaboration|team|leadership|manage|management)\b',
-        r'\b(motivation|motivated|drive|driven|passion|passionate|interest|interests|approach|philosophy|mindset|attitude)\b',
-        r'\b(problem.solving|decision.making|conflict|stress|pressure|challenge|adapt|adaptable|flexible|creativity|creative)\b',
-        r'\b(mentor|mentoring|learn|learning|grow|growth|feedback|improve|improvement|strengths|weaknesses|development)\b',
-        r'\b(behavior|behavioral|situation|situational|example|tell me about a time|describe a time|how do you|how would you)\b',
-    ]
-    
-    # Must match at least one allowed pattern
-    for pattern in allowed_patterns:
-        if re.search(pattern, question_lower, re.IGNORECASE):
-            return True
-    
-    return False
\ No newline at end of file
+    text = question.lower()
+    match = _FILTER.search(text)
+    if match is None or match.lastgroup == "blocked":
+        return False
+    return _BLOCKED.search(text, match.start()) is None
+
+
+def classify_questions(questions: Iterable[str]) -> List[bool]:
+    """is_question_about_tc for many questions at once, in input order."""
+    return [is_question_about_tc(question) for question in questions]
@@ -0,0 +1,55 @@
+"""Process-wide pooled HTTP clients shared by every OpenAI client in the chatbot."""
+import os
+
+import httpx
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "60"))
+
+_http_client = None
+_async_http_client = None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+    )
+
+
+def get_http_client() -> httpx.Client:
+    """Shared sync client with keep-alive, used by embeddings and chat models."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.Client(limits=_limits(), timeout=HTTP_TIMEOUT)
+    return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Shared async client with keep-alive.
+
+    Pooled connections belong to the event loop that opened them; uvicorn and
+    Mangum both run a single loop for the life of the process.
+    """
+    global _async_http_client
+    if _async_http_client is None or _async_http_client.is_closed:
+        _async_http_client = httpx.AsyncClient(limits=_limits(), timeout=HTTP_TIMEOUT)
+    return _async_http_client
+
+
+def openai_client_kwargs() -> dict:
+    """Keyword arguments that make a LangChain OpenAI model reuse the pooled clients."""
+    return {"http_client": get_http_client(), "http_async_client": get_async_http_client()}
+
+
+async def aclose_http_clients():
+    global _http_client, _async_http_client
+    if _async_http_client is not None:
+        await _async_http_client.aclose()
+        _async_http_client = None
+    if _http_client is not None:
+        _http_client.close()
+        _http_client = None
@@ -0,0 +1,91 @@
+"""LangChain retriever doing BM25 + FAISS hybrid search for the RetrievalQA chains."""
+from typing import Any, List, Optional
+
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from .bm25 import BM25Index, ahybrid_search, ahybrid_search_batch, hybrid_search
+from .context_packing import CONTEXT_PACKING, fetch_k, pack_context
+from .metrics import stage
+from .retrieval import RELEVANCE_THRESHOLD, RETRIEVAL_K, with_relevance
+from .usage import record_embedding
+
+
+class HybridRetriever(BaseRetriever):
+    """Fuses BM25 and vector rankings over one FAISS store; keyword fast path skips the embedding.
+
+    Vector hits need a cosine similarity of at least min_relevance; returned
+    documents carry it as metadata["relevance_score"]. The candidates are
+    narrowed to k by context_packing.pack_context. Callers that already embedded
+    the question (the answer cache lookup) pass it as invoke(..., query_vector=...).
+    Query embeddings go through the shared store's embeddings, on the system key,
+    so they are recorded as key class "free" whoever asked.
+    """
+
+    vectorstore: Any
+    bm25: Optional[BM25Index] = None
+    k: int = RETRIEVAL_K
+    min_relevance: float = RELEVANCE_THRESHOLD
+
+    def _vector_hits(self, vector, n: int):
+        return self._vector_hits_many([vector], n)[0]
+
+    def _vector_hits_many(self, vectors, n: int):
+        """Relevant hits for each query vector, from one index search over all of them."""
+        with stage("search"):
+            distances, rows = self.vectorstore.index.search(np.asarray(vectors, dtype=np.float32), n)
+        results = []
+        for row_distances, row_ids in zip(distances, rows):
+            # The index returns squared L2, which is 2 - 2 * cosine for unit vectors
+            hits = [(int(row), 1 - float(distance) / 2) for distance, row in zip(row_distances, row_ids) if row >= 0]
+            results.append([(row, relevance) for row, relevance in hits if relevance >= self.min_relevance])
+        return results
+
+    def _documents(self, hits) -> List[Document]:
+        with stage("pack"):
+            return self._packed_documents(hits)
+
+    def _packed_documents(self, hits) -> List[Document]:
+        ids = self.vectorstore.index_to_docstore_id
+        docs = [with_relevance(self.vectorstore.docstore.search(ids[position]), relevance)
+                for position, relevance in hits]
+        if not CONTEXT_PACKING or not docs:
+            return docs[:self.k]
+        vectors = [self.vectorstore.index.reconstruct(int(position)) for position, _ in hits]
+        return pack_context(docs, vectors, self.k)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun,
+                                query_vector=None) -> List[Document]:
+        def vector_search(question, n):
+            if query_vector is not None:
+                return self._vector_hits(query_vector, n)
+            with stage("embed"):
+                vector = self.vectorstore.embeddings.embed_query(question)
+            record_embedding("embed", self.vectorstore.embeddings, [question], key_class="free")
+            return self._vector_hits(vector, n)
+        return self._documents(hybrid_search(self.bm25, query, vector_search, fetch_k(self.k)))
+
+    async def _aget_relevant_documents(self, query: str, *,
+                                       run_manager: AsyncCallbackManagerForRetrieverRun,
+                                       query_vector=None) -> List[Document]:
+        async def vector_search(question, n):
+            if query_vector is not None:
+                return self._vector_hits(query_vector, n)
+            with stage("embed"):
+                vector = await self.vectorstore.embeddings.aembed_query(question)
+            record_embedding("embed", self.vectorstore.embeddings, [question], key_class="free")
+            return self._vector_hits(vector, n)
+        return self._documents(await ahybrid_search(self.bm25, query, vector_search, fetch_k(self.k)))
+
+    async def aretrieve_batch(self, questions: List[str]) -> List[List[Document]]:
+        """Documents for many questions: one embeddings request and one index search."""
+        async def aembed_many(texts):
+            with stage("embed"):
+                vectors = await self.vectorstore.embeddings.aembed_documents(texts)
+            record_embedding("embed", self.vectorstore.embeddings, texts, key_class="free")
+            return vectors
+        results = await ahybrid_search_batch(self.bm25, questions, aembed_many, self._vector_hits_many,
+                                             fetch_k(self.k))
+        return [self._documents(hits) for hits in results]
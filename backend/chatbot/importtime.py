@@ -0,0 +1,96 @@
+"""Import-time report for the Lambda handler module, with a budget check for CI.
+
+    python -m chatbot.importtime                  # top 25 imports by cumulative time
+    python -m chatbot.importtime --budget-ms 600  # exit 1 if chatbot.main exceeds the budget
+
+tests/test_importtime.py runs the same check under pytest.
+
+Runs `python -X importtime` in a fresh interpreter so nothing is already cached
+in sys.modules, with OPENAI_API_KEY unset to prove the SSM fetch is not on the
+import path.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, NamedTuple
+
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "800"))
+HANDLER_MODULE = "chatbot.main"
+# Loaded on first use; none of them belongs on the handler import path
+HEAVY_PACKAGES = frozenset({"langchain", "langchain_openai", "langchain_community", "faiss", "numpy", "openai",
+                            "boto3", "tiktoken"})
+
+
+class ImportTiming(NamedTuple):
+    module: str
+    depth: int
+    self_ms: float
+    cumulative_ms: float
+
+
+def profile_import(module: str = HANDLER_MODULE, repeat: int = 1) -> List[ImportTiming]:
+    """Import `module` in fresh interpreters and return per-module timings from the fastest run."""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [backend_dir, env.get("PYTHONPATH")]))
+    best = None
+    for _ in range(max(1, repeat)):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, env=env, cwd=backend_dir
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+        timings = _parse(result.stderr)
+        if best is None or total_ms(timings, module) < total_ms(best, module):
+            best = timings
+    return best
+
+
+def _parse(stderr: str) -> List[ImportTiming]:
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        timings.append(ImportTiming(name.strip(), depth, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return timings
+
+
+def total_ms(timings: List[ImportTiming], module: str = HANDLER_MODULE) -> float:
+    return next((t.cumulative_ms for t in timings if t.module == module), 0.0)
+
+
+def heavy_imports(timings: List[ImportTiming]) -> List[str]:
+    """HEAVY_PACKAGES that the profiled import loaded."""
+    return sorted({t.module.split(".")[0] for t in timings} & HEAVY_PACKAGES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time of the chatbot handler")
+    parser.add_argument("--module", default=HANDLER_MODULE)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs to take the fastest of")
+    args = parser.parse_args()
+
+    timings = profile_import(args.module, args.repeat)
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for timing in sorted(timings, key=lambda t: t.cumulative_ms, reverse=True)[:args.top]:
+        print(f"{timing.cumulative_ms:>14.1f} {timing.self_ms:>9.1f}  {'  ' * timing.depth}{timing.module}")
+
+    total = total_ms(timings, args.module)
+    heavy = heavy_imports(timings)
+    print(f"\n{args.module}: {total:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if heavy:
+        print(f"Heavy packages imported eagerly: {', '.join(heavy)}")
+    if total > args.budget_ms:
+        print("FAIL: handler import exceeds budget")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Process-wide FAISS index holder with background hot-reload."""
+import json
+import os
+import threading
+
+from .bm25 import HYBRID_RETRIEVAL, BM25Index
+from .index_manifest import MANIFEST_FILE
+
+# On-disk format to serve: "pickle" (FAISS.save_local), "mmap" (see mmap_index.py)
+# or "quantized" (see quantized_index.py)
+INDEX_FORMAT = os.getenv("INDEX_FORMAT", "pickle")
+# Seconds between checks of the index directory; 0 disables the background reloader
+INDEX_RELOAD_INTERVAL = float(os.getenv("INDEX_RELOAD_INTERVAL", "30"))
+
+
+def find_index_path():
+    """Determine the FAISS index directory based on environment."""
+    candidates = [
+        "/opt/python/faiss_index",  # Lambda environment - layer path (fallback)
+        os.path.join(os.path.dirname(__file__), "faiss_index"),  # Next to this package
+        "./chatbot/faiss_index",  # Local development from backend directory
+        "./faiss_index",  # Running from within chatbot directory
+    ]
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError("FAISS index not found in any expected location")
+
+
+def read_index_version(index_path):
+    """Version token for the on-disk index: manifest version plus index file mtime."""
+    manifest_version = None
+    try:
+        with open(os.path.join(index_path, MANIFEST_FILE), 'r') as f:
+            manifest_version = json.load(f).get('version')
+    except (OSError, ValueError):
+        pass
+    try:
+        mtime = os.path.getmtime(os.path.join(index_path, "index.faiss"))
+    except OSError:
+        mtime = None
+    return f"{manifest_version}:{mtime}"
+
+
+def _default_embeddings():
+    from langchain_openai import OpenAIEmbeddings
+    from .http_clients import openai_client_kwargs
+    return OpenAIEmbeddings(openai_api_key=os.environ.get("OPENAI_API_KEY"), **openai_client_kwargs())
+
+
+def _load_faiss(index_path, embeddings):
+    if INDEX_FORMAT == "quantized":
+        from .quantized_index import find_quantized_vectors, load_quantized_index
+        vectorstore = load_quantized_index(index_path, embeddings) if find_quantized_vectors(index_path) else None
+        if vectorstore is not None:
+            return vectorstore
+        print("INDEX_FORMAT=quantized but no matching quantized index found, falling back to mmap or pickle")
+    if INDEX_FORMAT in ("mmap", "quantized"):
+        from .mmap_index import has_mmap_index, load_mmap_index
+        if has_mmap_index(index_path):
+            return load_mmap_index(index_path, embeddings)
+        print(f"INDEX_FORMAT={INDEX_FORMAT} but no mmap index found, loading the pickle index")
+    from langchain_community.vectorstores import FAISS
+    return FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True)
+
+
+def _load_bm25(index_path, vectorstore):
+    """BM25 index written by the rebuild, or one built in memory for indexes that predate it."""
+    if not HYBRID_RETRIEVAL:
+        return None
+    bm25 = BM25Index.load(index_path)
+    if bm25 is None or len(bm25) != vectorstore.index.ntotal:
+        print("No BM25 index matching the vectors, building it in memory")
+        bm25 = BM25Index.from_vectorstore(vectorstore)
+    return bm25
+
+
+class IndexSnapshot:
+    """An immutable (vectorstore, version) pair; requests keep the snapshot they started with."""
+
+    def __init__(self, vectorstore, version, path, bm25=None):
+        self.vectorstore = vectorstore
+        self.version = version
+        self.path = path
+        self.bm25 = bm25
+
+
+class IndexManager:
+    """Holds the single loaded index and atomically swaps in a new one when it changes on disk.
+
+    Loading happens on first use and afterwards only on the background reloader
+    thread, so the request path never pays deserialization cost after warm-up.
+    """
+
+    def __init__(self, embeddings_factory=_default_embeddings, loader=_load_faiss,
+                 interval: float = INDEX_RELOAD_INTERVAL):
+        self.embeddings_factory = embeddings_factory
+        self.loader = loader
+        self.interval = interval
+        self.reloads = 0
+        self._snapshot = None
+        self._listeners = []
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def snapshot(self) -> IndexSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._load_lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load()
+                snapshot = self._snapshot
+        return snapshot
+
+    def vectorstore(self):
+        return self.snapshot().vectorstore
+
+    @property
+    def version(self):
+        snapshot = self._snapshot
+        return snapshot.version if snapshot else None
+
+    def on_swap(self, callback):
+        """Register callback(new_snapshot), called after a reload swaps the index."""
+        self._listeners.append(callback)
+
+    def _load(self) -> IndexSnapshot:
+        path = find_index_path()
+        # Read the version first so a rebuild racing with the load is picked up next poll
+        version = read_index_version(path)
+        vectorstore = self.loader(path, self.embeddings_factory())
+        return IndexSnapshot(vectorstore, version, path, _load_bm25(path, vectorstore))
+
+    def reload_if_changed(self) -> bool:
+        """Load and swap in the on-disk index if its version differs from the loaded one."""
+        current = self._snapshot
+        if current is None:
+            return False
+        if read_index_version(find_index_path()) == current.version:
+            return False
+        with self._load_lock:
+            try:
+                fresh = self._load()
+            except Exception as e:
+                print(f"Index reload failed, keeping version {current.version}: {e}")
+                return False
+            # Single reference assignment: in-flight requests keep the old snapshot
+            self._snapshot = fresh
+            self.reloads += 1
+        print(f"Index reloaded: {current.version} -> {fresh.version}")
+        for callback in self._listeners:
+            callback(fresh)
+        return True
+
+    def start(self):
+        """Start the background reloader (idempotent)."""
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="index-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.reload_if_changed()
+            except Exception as e:
+                print(f"Index watcher error: {e}")
+
+    def stats(self) -> dict:
+        return {"version": self.version, "reloads": self.reloads}
+
+
+_index_manager = None
+
+
+def get_index_manager(embeddings_factory=None) -> IndexManager:
+    """Process-wide index manager shared by /ask and /chat."""
+    global _index_manager
+    if _index_manager is None:
+        _index_manager = IndexManager(embeddings_factory or _default_embeddings)
+    return _index_manager
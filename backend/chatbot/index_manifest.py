@@ -0,0 +1,62 @@
+"""Source-path -> vector-id manifest kept next to the FAISS index."""
+import json
+import os
+from typing import Dict, List, Optional
+
+MANIFEST_FILE = "manifest.json"
+
+
+def source_key(source_path: str) -> str:
+    """Manifest key for a content file, relative to the content directory when possible."""
+    from . import content_ingest
+
+    absolute = os.path.abspath(source_path)
+    if absolute.startswith(content_ingest.CONTENT_DIR + os.sep):
+        return os.path.relpath(absolute, content_ingest.CONTENT_DIR)
+    return source_path
+
+
+class IndexManifest:
+    """Tracks which vector ids belong to which source file, plus an index version counter.
+
+    `quantized` records the quantized copy the rebuild wrote ({"kind", "ntotal"}), or None.
+    """
+
+    def __init__(self, sources: Dict[str, List[str]] = None, version: int = 0, quantized: Optional[dict] = None):
+        self.sources = sources or {}
+        self.version = version
+        self.quantized = quantized
+
+    @classmethod
+    def load(cls, index_path: str, vectorstore=None) -> "IndexManifest":
+        """Load the manifest, reconstructing it from the docstore for indexes built before it existed."""
+        path = os.path.join(index_path, MANIFEST_FILE)
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                data = json.load(f)
+            return cls(data.get('sources', {}), data.get('version', 0), data.get('quantized'))
+        manifest = cls()
+        if vectorstore is not None:
+            for doc_id in vectorstore.index_to_docstore_id.values():
+                doc = vectorstore.docstore.search(doc_id)
+                source = getattr(doc, 'metadata', {}).get('source', '')
+                manifest.sources.setdefault(source_key(source), []).append(doc_id)
+        return manifest
+
+    def save(self, index_path: str):
+        path = os.path.join(index_path, MANIFEST_FILE)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': self.version, 'sources': self.sources, 'quantized': self.quantized}, f,
+                      indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def remove(self, key: str) -> List[str]:
+        """Forget a source and return the vector ids that belonged to it."""
+        return self.sources.pop(key, [])
+
+    def add(self, key: str, ids: List[str]):
+        self.sources.setdefault(key, []).extend(ids)
+
+    def vector_count(self) -> int:
+        return sum(len(ids) for ids in self.sources.values())
@@ -0,0 +1,250 @@
+"""Lean retrieval engine: NumPy top-k over the index vectors and one direct chat call.
+
+A drop-in for the RetrievalQA chain on the /ask path (same invoke/ainvoke input and
+output keys) that skips LangChain's chain, retriever and prompt machinery. Query
+embeddings and completions go straight through the OpenAI SDK on the pooled HTTP
+clients; only numpy and openai are imported on first use.
+"""
+from typing import List, Tuple
+
+from .bm25 import ahybrid_search, ahybrid_search_batch, hybrid_search
+from .context_packing import CONTEXT_PACKING, fetch_k, pack_context
+from .http_clients import get_async_http_client, get_http_client
+from .metrics import stage
+from .prompts import NO_CONTEXT_ANSWER
+from .retrieval import RELEVANCE_THRESHOLD, RETRIEVAL_K, build_prompt, with_relevance
+from .usage import record_completion
+
+# OpenAIEmbeddings' default; indexes copied from a vectorstore use the model that built it
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
+
+class NumpyIndex:
+    """Contiguous float32 matrix of unit-length vectors with the documents they point at.
+
+    embedding_params are the embeddings.create arguments (model, dimensions) that
+    produce query vectors comparable with these.
+    """
+
+    def __init__(self, vectors, documents, bm25=None, embedding_params=None):
+        import numpy as np
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        self.vectors = vectors / norms
+        # Anything indexable by row position
+        self.documents = documents
+        self.bm25 = bm25
+        self.embedding_params = embedding_params or {"model": EMBEDDING_MODEL}
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore, bm25=None) -> "NumpyIndex":
+        """Copy the vectors out of a loaded LangChain FAISS store."""
+        from .quantized_index import is_quantized
+        index = vectorstore.index
+        documents = _DocstoreView(vectorstore.docstore, vectorstore.index_to_docstore_id)
+        embedding_params = _embedding_params(vectorstore.embeddings)
+        if is_quantized(index):
+            # Copying the vectors out would undo the compression
+            return FaissSearchIndex(index, documents, bm25, embedding_params)
+        return cls(index.reconstruct_n(0, index.ntotal), documents, bm25, embedding_params)
+
+    def __len__(self):
+        return self.vectors.shape[0]
+
+    def search(self, query_vector, k: int = RETRIEVAL_K, min_similarity: float = None) -> List[Tuple[int, float]]:
+        """Top-k (position, cosine similarity) pairs, best first."""
+        return self.search_many([query_vector], k, min_similarity)[0]
+
+    def search_many(self, query_vectors, k: int = RETRIEVAL_K,
+                    min_similarity: float = None) -> List[List[Tuple[int, float]]]:
+        """search() for a batch of queries with one matrix product."""
+        import numpy as np
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        scores = (queries / norms) @ self.vectors.T
+        k = min(k, scores.shape[1])
+        if k == 0:
+            return [[] for _ in range(scores.shape[0])]
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(k), (scores.shape[0], k))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top, top_scores = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+        results = []
+        for rows, row_scores in zip(top.tolist(), top_scores.tolist()):
+            hits = list(zip(rows, row_scores))
+            if min_similarity is not None:
+                hits = [(i, score) for i, score in hits if score >= min_similarity]
+            results.append(hits)
+        return results
+
+    def documents_for(self, hits):
+        """Documents for (position, relevance) hits, scores attached."""
+        return [with_relevance(self.documents[i], relevance) for i, relevance in hits]
+
+    def vectors_for(self, positions):
+        return self.vectors[list(positions)]
+
+
+class FaissSearchIndex(NumpyIndex):
+    """NumpyIndex interface over a faiss index that is searched in place (INDEX_FORMAT=quantized)."""
+
+    def __init__(self, index, documents, bm25=None, embedding_params=None):
+        self.index = index
+        self.documents = documents
+        self.bm25 = bm25
+        self.embedding_params = embedding_params or {"model": EMBEDDING_MODEL}
+
+    def __len__(self):
+        return self.index.ntotal
+
+    def search_many(self, query_vectors, k: int = RETRIEVAL_K,
+                    min_similarity: float = None) -> List[List[Tuple[int, float]]]:
+        import numpy as np
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        distances, rows = self.index.search(queries / norms, k)
+        results = []
+        for row_distances, row_ids in zip(distances, rows):
+            # Squared L2 between unit vectors is 2 - 2 * cosine
+            hits = [(int(row), 1 - float(distance) / 2) for distance, row in zip(row_distances, row_ids) if row >= 0]
+            if min_similarity is not None:
+                hits = [(i, score) for i, score in hits if score >= min_similarity]
+            results.append(hits)
+        return results
+
+    def vectors_for(self, positions):
+        import numpy as np
+        # IndexRefine reconstructs from the full-precision vectors
+        return np.stack([self.index.reconstruct(int(i)) for i in positions])
+
+
+def _embedding_params(embeddings) -> dict:
+    """Model (and dimensions, for text-embedding-3) of the vectorstore's OpenAIEmbeddings."""
+    params = {"model": getattr(embeddings, "model", None) or EMBEDDING_MODEL}
+    dimensions = getattr(embeddings, "dimensions", None)
+    if dimensions:
+        params["dimensions"] = dimensions
+    return params
+
+
+class _DocstoreView:
+    """Row-position view over a docstore; MmapDocstore only decodes the rows asked for."""
+
+    def __init__(self, docstore, index_to_docstore_id):
+        self._docstore = docstore
+        self._ids = index_to_docstore_id
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, position):
+        return self._docstore.search(self._ids[position])
+
+
+class LeanQA:
+    """Embed the question, search the NumpyIndex, format the prompt and call chat completions."""
+
+    def __init__(self, index: NumpyIndex, api_key: str, model: str = "gpt-4o-mini",
+                 temperature: float = 0.3, max_tokens: int = 400, k: int = RETRIEVAL_K,
+                 min_relevance: float = RELEVANCE_THRESHOLD):
+        from openai import AsyncOpenAI, OpenAI
+        self.index = index
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.k = k
+        self.min_relevance = min_relevance
+        self._client = OpenAI(api_key=api_key, http_client=get_http_client(), max_retries=2)
+        self._async_client = AsyncOpenAI(api_key=api_key, http_client=get_async_http_client(), max_retries=2)
+
+    def _messages(self, question, docs):
+        return [{"role": "user", "content": build_prompt(question, docs)}]
+
+    def _completion_kwargs(self, question, docs):
+        return {"model": self.model, "temperature": self.temperature, "max_tokens": self.max_tokens,
+                "messages": self._messages(question, docs)}
+
+    def _vector_search(self, question, n):
+        with stage("embed"):
+            response = self._client.embeddings.create(**self.index.embedding_params, input=[question])
+        record_completion("embed", response)
+        with stage("search"):
+            return self.index.search(response.data[0].embedding, n, self.min_relevance)
+
+    async def _avector_search(self, question, n):
+        with stage("embed"):
+            response = await self._async_client.embeddings.create(**self.index.embedding_params, input=[question])
+        record_completion("embed", response)
+        with stage("search"):
+            return self.index.search(response.data[0].embedding, n, self.min_relevance)
+
+    async def _aembed_many(self, questions):
+        with stage("embed"):
+            response = await self._async_client.embeddings.create(**self.index.embedding_params, input=questions)
+        record_completion("embed", response)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    def _search_many(self, vectors, n):
+        with stage("search"):
+            return self.index.search_many(vectors, n, self.min_relevance)
+
+    def _pack(self, hits):
+        with stage("pack"):
+            docs = self.index.documents_for(hits)
+            if not CONTEXT_PACKING or not docs:
+                return docs[:self.k]
+            return pack_context(docs, self.index.vectors_for(position for position, _ in hits), self.k)
+
+    def retrieve(self, question: str, query_vector=None):
+        """BM25 fast path or fused BM25 + vector hits (see bm25.py), packed by context_packing.py.
+
+        query_vector is the question's embedding when the caller already has it.
+        """
+        vector_search = self._vector_search
+        if query_vector is not None:
+            def vector_search(question, n):
+                return self._search_many([query_vector], n)[0]
+        return self._pack(hybrid_search(self.index.bm25, question, vector_search, fetch_k(self.k)))
+
+    async def aretrieve(self, question: str, query_vector=None):
+        vector_search = self._avector_search
+        if query_vector is not None:
+            async def vector_search(question, n):
+                return self._search_many([query_vector], n)[0]
+        return self._pack(await ahybrid_search(self.index.bm25, question, vector_search, fetch_k(self.k)))
+
+    async def aretrieve_batch(self, questions: List[str]):
+        """aretrieve for many questions: one embeddings request and one matrix search."""
+        results = await ahybrid_search_batch(self.index.bm25, questions, self._aembed_many, self._search_many,
+                                             fetch_k(self.k))
+        return [self._pack(hits) for hits in results]
+
+    async def aanswer(self, question: str, docs) -> str:
+        """Completion for already retrieved documents."""
+        with stage("llm"):
+            completion = await self._async_client.chat.completions.create(**self._completion_kwargs(question, docs))
+        record_completion("llm", completion)
+        return completion.choices[0].message.content
+
+    def invoke(self, inputs: dict) -> dict:
+        question = inputs["query"]
+        docs = self.retrieve(question, inputs.get("query_vector"))
+        if not docs:
+            return {"query": question, "result": NO_CONTEXT_ANSWER, "source_documents": []}
+        with stage("llm"):
+            completion = self._client.chat.completions.create(**self._completion_kwargs(question, docs))
+        record_completion("llm", completion)
+        return {"query": question, "result": completion.choices[0].message.content, "source_documents": docs}
+
+    async def ainvoke(self, inputs: dict) -> dict:
+        question = inputs["query"]
+        docs = await self.aretrieve(question, inputs.get("query_vector"))
+        if not docs:
+            return {"query": question, "result": NO_CONTEXT_ANSWER, "source_documents": []}
+        return {"query": question, "result": await self.aanswer(question, docs), "source_documents": docs}
@@ -1,28 +1,39 @@
 import os
-from fastapi import FastAPI
+import json
+import functools
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 
-# Normal imports - no more lazy loading needed with container images
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain_community.vectorstores import FAISS
-from langchain.prompts import PromptTemplate
-from langchain.chains import RetrievalQA
-
+# LangChain/OpenAI, numpy and the SSM secret are loaded on first use (see
+# STARTUP_MODE), so a cold start can serve /health before any of them load.
 from .routes import router
-from .services import query_vectorstore
-from .filters import is_question_about_tc
+from .filters import classify_questions, is_question_about_tc
 from .sources import format_sources_as_links
 from .confidence import calculate_confidence_score
-from .summarization import summarize_response
+from .answer_cache import ANSWER_CACHE_ENABLED, get_answer_cache, normalize_question
+from .admission import ADMISSION_ENABLED, AdmissionRejected, admit, client_id, get_admission
+from .chain_pool import QAChainPool, api_key_hash
+from .coalescing import COALESCE_ENABLED, SingleFlight
+from .index_manager import get_index_manager
+from .retrieval import RETRIEVAL_ENGINE
+from .metrics import METRICS_ENABLED, StageTimingMiddleware, current_timings, stage
+from .usage import key_class, record_embedding, track_usage
 from pydantic import BaseModel
 from typing import List
 from mangum import Mangum
-from .models import AskRequest, AskResponse
+from .models import AskRequest, AskResponse, BatchAskRequest, BatchAskResponse
+from .prompts import ANSWER_MAX_TOKENS, ANSWER_MODE, NO_CONTEXT_ANSWER, OFF_TOPIC_ANSWER
 
-# Global variables for caching
-_vectorstore = None
+# Global variables for caching; index-bound objects are stored as (snapshot, object)
 _qa_chain = None
+_qa_prompt = None
+_retriever = None
+_numpy_index = None
+_qa_chain_pool = QAChainPool()
+# Concurrent duplicate /ask requests share one answer
+_ask_flight = SingleFlight("/ask")
 
 # Configuration
 def get_openai_api_key():
@@ -48,85 +59,168 @@ def get_openai_api_key():
         print(f"Failed to retrieve API key from SSM: {e}")
         raise ValueError("OPENAI_API_KEY not found in environment or SSM Parameter Store")
 
-OPENAI_API_KEY = get_openai_api_key()
+@functools.lru_cache(maxsize=1)
+def get_default_api_key():
+    """Free-tier API key, fetched (possibly from SSM) on the first request that needs it."""
+    return get_openai_api_key()
+
+def __getattr__(name):
+    # Keep `main.OPENAI_API_KEY` working without resolving the secret at import time
+    if name == "OPENAI_API_KEY":
+        return get_default_api_key()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "").split(",")
+# "lazy" defers heavy imports, the secret fetch and index load to the first request;
+# "eager" does them at startup (uvicorn) or in the first Lambda invocation
+STARTUP_MODE = os.getenv("STARTUP_MODE", "lazy")
+# /ask/batch: questions per request, and completions in flight at once per batch
+BATCH_MAX_QUESTIONS = int(os.getenv("BATCH_MAX_QUESTIONS", "20"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
+def _create_embeddings():
+    from langchain_openai import OpenAIEmbeddings
+    from .http_clients import openai_client_kwargs
+    return OpenAIEmbeddings(openai_api_key=get_default_api_key(), **openai_client_kwargs())
+
+# One loaded index shared by /ask and /chat, hot-reloaded when it changes on disk
+index_manager = get_index_manager(_create_embeddings)
+
+def get_index_version():
+    """Version token of the loaded index; changes whenever a rebuilt index is swapped in."""
+    return index_manager.version
 
 def get_vectorstore():
-    """Get the FAISS vectorstore from appropriate location."""
-    global _vectorstore
-    if _vectorstore is None:
-        embeddings = OpenAIEmbeddings(openai_api_key=OPENAI_API_KEY)
-        
-        # Determine the correct path based on environment
-        if os.path.exists("/opt/python/faiss_index"):
-            # Lambda environment - layer path (fallback)
-            faiss_path = "/opt/python/faiss_index"
-        elif os.path.exists("./chatbot/faiss_index"):
-            # Local development from backend directory
-            faiss_path = "./chatbot/faiss_index"
-        elif os.path.exists("./faiss_index"):
-            # Running from within chatbot directory
-            faiss_path = "./faiss_index"
-        else:
-            raise FileNotFoundError("FAISS index not found in any expected location")
-            
-        _vectorstore = FAISS.load_local(
-            faiss_path, 
-            embeddings, 
-            allow_dangerous_deserialization=True
-        )
-    return _vectorstore
+    """Get the shared FAISS vectorstore."""
+    return index_manager.vectorstore()
+
+def _on_index_swap(snapshot):
+    """Chains hold retrievers bound to the old index; rebuild them lazily against the new one.
+
+    Only frees memory early: each cached object is checked against the current
+    snapshot on use, so one built from the old index during the swap is never served.
+    """
+    global _qa_chain, _retriever, _numpy_index
+    _qa_chain = None
+    _retriever = None
+    _numpy_index = None
+    _qa_chain_pool.clear()
+
+index_manager.on_swap(_on_index_swap)
 
 def get_qa_chain(api_key=None):
-    """Get the RetrievalQA chain with specified API key."""
-    # Use provided API key or default
-    openai_key = api_key or OPENAI_API_KEY
-    
-    # Always create new chain if using user API key to avoid caching issues
+    """Get the RetrievalQA chain with specified API key, bound to the current index."""
+    snapshot = index_manager.snapshot()
+    # User API keys get chains from a bounded pool keyed by a hash of the key
     if api_key:
-        return _create_qa_chain(openai_key)
+        return _qa_chain_pool.get(api_key, lambda key: _create_qa_chain(key, snapshot), scope=snapshot)
     
-    # Cache only the default chain
+    # Cache the default chain
     global _qa_chain
-    if _qa_chain is None:
-        _qa_chain = _create_qa_chain(openai_key)
-    return _qa_chain
+    if _qa_chain is None or _qa_chain[0] is not snapshot:
+        _qa_chain = (snapshot, _create_qa_chain(get_default_api_key(), snapshot))
+    return _qa_chain[1]
 
 
-def _create_qa_chain(openai_key):
-    """Create a new QA chain with the specified OpenAI API key."""
-    # Import prompt template from services to ensure consistency
-    from .services import prompt_template
-    
-    prompt = PromptTemplate(
-        template=prompt_template,
-        input_variables=["context", "question"]
+def _get_qa_prompt():
+    """Prompt shared by every QA chain."""
+    global _qa_prompt
+    if _qa_prompt is None:
+        from langchain.prompts import PromptTemplate
+        from .prompts import prompt_template
+        _qa_prompt = PromptTemplate(
+            template=prompt_template,
+            input_variables=["context", "question"]
+        )
+    return _qa_prompt
+
+
+def _get_retriever(snapshot=None):
+    """Retriever over the single shared vectorstore, reused by every QA chain."""
+    global _retriever
+    snapshot = snapshot or index_manager.snapshot()
+    if _retriever is None or _retriever[0] is not snapshot:
+        from .hybrid_retriever import HybridRetriever
+        _retriever = (snapshot, HybridRetriever(
+            vectorstore=snapshot.vectorstore,
+            bm25=snapshot.bm25,     # Keyword fast path and rank fusion
+            k=5                     # Increase to 5 for more context
+        ))                          # Chunks below RELEVANCE_THRESHOLD are dropped
+    return _retriever[1]
+
+
+def _create_llm(openai_key, streaming=False):
+    """Create the chat model used to answer questions."""
+    from langchain_openai import ChatOpenAI
+    from .http_clients import openai_client_kwargs
+    from .usage_callback import UsageCallback
+    return ChatOpenAI(
+        model="gpt-4o-mini",  # Use GPT-4o-mini for better quality and cost efficiency
+        temperature=0.3,  # Slightly more creative for natural responses
+        max_tokens=ANSWER_MAX_TOKENS,  # 400, or less when ANSWER_MODE=concise
+        streaming=streaming,
+        stream_usage=streaming,  # Streams only report usage when asked to
+        callbacks=[UsageCallback("llm", "gpt-4o-mini")],  # Token and cost accounting
+        openai_api_key=openai_key,
+        **openai_client_kwargs()  # Shared keep-alive connection pool
     )
-    
-    # Create the RetrievalQA chain
-    return RetrievalQA.from_chain_type(
-        llm=ChatOpenAI(
-            model="gpt-4o-mini",  # Use GPT-4o-mini for better quality and cost efficiency
-            temperature=0.3,  # Slightly more creative for natural responses
-            max_tokens=400,   # Increase to 400 tokens for initial response
-            openai_api_key=openai_key
-        ),
-        retriever=get_vectorstore().as_retriever(
-            search_type="similarity",
-            search_kwargs={
-                "k": 5,           # Increase to 5 for more context
-                "score_threshold": 0.5  # Lower threshold to include more relevant docs
-            }
-        ),
+
+
+def _get_numpy_index(snapshot=None):
+    """Vectors of the shared index as one float32 matrix, for the lean engine."""
+    global _numpy_index
+    snapshot = snapshot or index_manager.snapshot()
+    if _numpy_index is None or _numpy_index[0] is not snapshot:
+        from .lean_qa import NumpyIndex
+        _numpy_index = (snapshot, NumpyIndex.from_vectorstore(snapshot.vectorstore, snapshot.bm25))
+    return _numpy_index[1]
+
+
+def _create_lean_qa(openai_key, snapshot=None):
+    """LeanQA with the same model settings as _create_llm."""
+    from .lean_qa import LeanQA
+    return LeanQA(_get_numpy_index(snapshot), openai_key, model="gpt-4o-mini", temperature=0.3,
+                  max_tokens=ANSWER_MAX_TOKENS)
+
+
+def _create_qa_chain(openai_key, snapshot=None):
+    """Create a new QA chain with the specified OpenAI API key over `snapshot` (default: the current index)."""
+    if RETRIEVAL_ENGINE == "numpy":
+        return _create_lean_qa(openai_key, snapshot)
+    from .qa_chain import GroundedRetrievalQA
+    # Create the RetrievalQA chain; it answers without the LLM when nothing is relevant
+    return GroundedRetrievalQA.from_chain_type(
+        llm=_create_llm(openai_key),
+        retriever=_get_retriever(snapshot),
         return_source_documents=True,
-        chain_type_kwargs={"prompt": prompt}
+        chain_type_kwargs={"prompt": _get_qa_prompt()}
     )
 
 # Create FastAPI app
 app = FastAPI(title="Chatbot Backend", version="1.0.0")
 
-# Mangum handler for AWS Lambda
-handler = Mangum(app)
+# Mangum handler for AWS Lambda. Mangum would run the startup and shutdown events
+# around every invocation, closing the pooled HTTP clients the cached chains hold;
+# a container's clients and index instead live until Lambda freezes or recycles it.
+_mangum = Mangum(app, lifespan="off")
+
+_container_started = False
+
+def _start_container():
+    """Once per process: the STARTUP_MODE=eager warm-up and the index reloader."""
+    global _container_started
+    if _container_started:
+        return
+    _container_started = True
+    if STARTUP_MODE == "eager":
+        # Pay the import, secret and index load cost now instead of on the first request
+        get_qa_chain()
+    index_manager.start()
+
+def handler(event, context):
+    """Lambda entry point; with lifespan off, the first invocation does the startup work."""
+    _start_container()
+    return _mangum(event, context)
 
 app.add_middleware(
     CORSMiddleware,
@@ -139,103 +233,396 @@ app.add_middleware(
 # Include API routes
 app.include_router(router)
 
+if METRICS_ENABLED:
+    # Server-Timing on every response and the histograms behind /metrics
+    app.add_middleware(StageTimingMiddleware, routes=("/ask", "/ask/stream", "/ask/batch", "/chat", "/health", "/stats", "/metrics"))
+
 # Log a message when the app starts
 @app.on_event("startup")
 async def startup_event():
     print("TC Heiner Chatbot is starting up...")
+    await run_in_threadpool(_start_container)
 
 # Log a message when the app shuts down
 @app.on_event("shutdown")
 async def shutdown_event():
     print("TC Heiner Chatbot is shutting down...")
+    index_manager.stop()
+    from .http_clients import aclose_http_clients
+    await aclose_http_clients()
 
 
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "POST, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Authorization, X-Requested-With"
+}
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request, exc: AdmissionRejected):
+    """Over the client's rate limit or the server's queue: tell the client when to come back."""
+    from fastapi.responses import JSONResponse
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many requests, please retry shortly.", "reason": exc.reason},
+        headers={**CORS_HEADERS, "Retry-After": exc.retry_after_header}
+    )
+
 @app.options("/ask")
 def ask_options():
     from fastapi import Response
     return Response(
         content="",
         status_code=200,
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "POST, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type, Authorization, X-Requested-With"
-        }
+        headers=CORS_HEADERS
     )
 
+def _json_response(response: AskResponse):
+    """Serialize an AskResponse with CORS headers for browser requests."""
+    from fastapi import Response
+    return Response(
+        content=response.model_dump_json(),
+        media_type="application/json",
+        headers=CORS_HEADERS
+    )
+
+def _model_note(user_api_key):
+    if user_api_key:
+        return "\n\n*Response generated using your API key with GPT-4o-mini*"
+    return "\n\n*Free response powered by GPT-4o-mini*"
+
+async def _versioned_answer_cache():
+    """The answer cache, checked against the loaded index's version; None if the index can't be loaded."""
+    cache = get_answer_cache()
+    try:
+        # Load the index first: its version decides whether cached answers still hold
+        snapshot = await run_in_threadpool(index_manager.snapshot)
+    except Exception as e:
+        print(f"Answer cache lookup skipped, index not loaded: {e}")
+        return None
+    cache.check_version(snapshot.version)
+    return cache
+
+async def _lookup_cached_answer(question):
+    """Return (cached_answer, question_embedding) from the semantic answer cache."""
+    cache = await _versioned_answer_cache()
+    if cache is None:
+        return None, None
+    cached = cache.get_exact(question)
+    question_embedding = None
+    if cached is None and cache.semantic_enabled:
+        try:
+            snapshot = await run_in_threadpool(index_manager.snapshot)
+            # Keyword lookups are retrieved without an embedding; don't spend one here either
+            if snapshot.bm25 is not None and snapshot.bm25.fast_path(question, 1) is not None:
+                return None, None
+            question_embedding = await snapshot.vectorstore.embeddings.aembed_query(question)
+            record_embedding("cache", snapshot.vectorstore.embeddings, [question], key_class="free")
+            cached = cache.get_similar(question_embedding)
+        except Exception as e:
+            print(f"Answer cache similarity lookup failed: {e}")
+    return cached, question_embedding
+
+@app.get("/metrics")
+def metrics_endpoint():
+    """Prometheus text format; stage histograms are only recorded with METRICS_ENABLED=true."""
+    from fastapi import Response
+    from .metrics import render_metrics
+    return Response(content=render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/stats")
+def stats_endpoint():
+    from .summarization import summary_cache_stats
+    return {
+        "index": index_manager.stats(),
+        "answer_cache": get_answer_cache().stats(),
+        "qa_chain_pool": _qa_chain_pool.stats(),
+        "summary_cache": summary_cache_stats(),
+        "coalescing": _ask_flight.stats(),
+        "admission": get_admission().stats()
+    }
+
+def _flight_key(request: AskRequest):
+    """Requests that get the same answer: normalized question, model settings and the paying key."""
+    key_id = api_key_hash(request.userApiKey) if request.userApiKey else "free"
+    return (normalize_question(request.question), RETRIEVAL_ENGINE, ANSWER_MODE, ANSWER_MAX_TOKENS, key_id)
+
+async def _answer_with_usage(request: AskRequest, usage):
+    return await _answer(request), usage
+
 @app.post("/ask", response_model=AskResponse)
-def ask_endpoint(request: AskRequest):
+async def ask_endpoint(request: AskRequest, http_request: Request):
+    # Rate limit and concurrency slot first; rejected requests get a 429 before any work
+    async with admit(http_request, "/ask", request.userApiKey):
+        return await _ask(request)
+
+async def _ask(request: AskRequest):
+    # Tokens and cost of every OpenAI call below, attributed to the free or user key
+    with track_usage(key_class(request.userApiKey)) as usage:
+        if COALESCE_ENABLED:
+            # Duplicates arriving while the same question is in flight wait for its answer
+            (response, leader_usage), shared = await _ask_flight.run(
+                _flight_key(request), lambda: _answer_with_usage(request, usage))
+            if shared:
+                _ask_flight.record_saved_calls(leader_usage.calls())
+        else:
+            response = await _answer(request)
+    if request.debug:
+        # Coalesced requests share one AskResponse; never modify it in place
+        response = response.model_copy(update={"debug": {"usage": usage.as_dict(), "stage_ms": current_timings()}})
+    # Add CORS headers for browser requests
+    return _json_response(response)
+
+async def _answer(request: AskRequest) -> AskResponse:
     # Content filtering - ensure questions are about TC Heiner
-    if not is_question_about_tc(request.question):
-        response = AskResponse(
-            answer="I can only answer questions about TC Heiner's experience, skills, projects, and professional background. Please ask something related to his work or career.",
-            sources=[]
-        )
-        from fastapi import Response
-        return Response(
-            content=response.model_dump_json(),
-            media_type="application/json",
-            headers={
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "POST, OPTIONS",
-                "Access-Control-Allow-Headers": "Content-Type, Authorization, X-Requested-With"
-            }
-        )
+    with stage("filter"):
+        allowed = is_question_about_tc(request.question)
+    if not allowed:
+        return AskResponse(answer=OFF_TOPIC_ANSWER, sources=[])
+    
+    # Serve repeat and near-repeat questions without touching the QA chain
+    question_embedding = None
+    if ANSWER_CACHE_ENABLED:
+        with stage("cache"):
+            cached, question_embedding = await _lookup_cached_answer(request.question)
+        if cached is not None:
+            return AskResponse(
+                answer=cached.answer + _model_note(request.userApiKey),
+                sources=cached.sources
+            )
     
     try:
         # Use the QA chain with appropriate API key
-        qa_chain = get_qa_chain(request.userApiKey)
-        result = qa_chain.invoke({"query": request.question})
-        raw_answer = result["result"]
-        sources = result["source_documents"]
-        
-        # Only summarize if response is longer than ~150 tokens (roughly 600 characters)
-        api_key = request.userApiKey or OPENAI_API_KEY
-        if len(raw_answer) > 600:  # Approximate 150 tokens
-            summarized_answer = summarize_response(raw_answer, api_key)
-        else:
-            summarized_answer = raw_answer
-        
-        # Format clickable source links
+        # First use loads the index from disk, so keep that off the event loop
+        with stage("load"):
+            qa_chain = await run_in_threadpool(get_qa_chain, request.userApiKey)
+        # embed, search, pack and llm stages are recorded inside the chain;
+        # the cache lookup's embedding is reused instead of embedding again
+        result = await qa_chain.ainvoke({"query": request.question, "query_vector": question_embedding})
+        return await _finish_answer(request.question, result["result"], result["source_documents"],
+                                    request.userApiKey, question_embedding)
+    except Exception as e:
+        return _error_response(e)
+
+async def _finish_answer(question, raw_answer, sources, user_api_key, question_embedding=None) -> AskResponse:
+    """Summarize if long, add source links and model note, cache, and score confidence."""
+    # Only summarize long answers (tiktoken count; see ANSWER_MODE), memoized per answer
+    from .summarization import asummarize_response, needs_summary
+    api_key = user_api_key or get_default_api_key()
+    if needs_summary(raw_answer):
+        with stage("summarize"):
+            summarized_answer = await asummarize_response(raw_answer, api_key)
+    else:
+        summarized_answer = raw_answer
+    
+    # Format clickable source links
+    with stage("format"):
         source_links = format_sources_as_links(sources)
-        
-        # Add model note only (remove confidence explanation)
-        model_note = ""
-        if request.userApiKey:
-            model_note = "\n\n*Response generated using your API key with GPT-4o-mini*"
-        else:
-            model_note = "\n\n*Free response powered by GPT-4o-mini*"
-        
-        # Combine all parts (no confidence note)
-        full_answer = summarized_answer + source_links + model_note
-        
-        response = AskResponse(
-            answer=full_answer, 
-            sources=[doc.metadata.get("source", "") for doc in sources]
+        source_paths = [doc.metadata.get("source", "") for doc in sources]
+    
+    if ANSWER_CACHE_ENABLED:
+        get_answer_cache().set(question, summarized_answer + source_links, source_paths, question_embedding)
+    
+    # Combine all parts (no confidence note in the text; it's a separate field)
+    full_answer = summarized_answer + source_links + _model_note(user_api_key)
+    confidence, _ = calculate_confidence_score(sources, question)
+    
+    return AskResponse(
+        answer=full_answer, 
+        sources=source_paths,
+        confidence=confidence
+    )
+
+def _error_response(e: Exception) -> AskResponse:
+    # Handle API key errors gracefully
+    error_msg = str(e)
+    if "api" in error_msg.lower() and "key" in error_msg.lower():
+        return AskResponse(
+            answer="There seems to be an issue with the API key provided. Please check that it's a valid OpenAI API key and try again.",
+            sources=[]
         )
-        
+    return AskResponse(
+        answer=f"I encountered an error processing your question: {error_msg}",
+        sources=[]
+    )
+
+
+@app.options("/ask/batch")
+def ask_batch_options():
+    return ask_options()
+
+@app.post("/ask/batch", response_model=BatchAskResponse)
+async def ask_batch_endpoint(request: BatchAskRequest, http_request: Request):
+    """Answer a list of questions; answers come back in input order.
+
+    All questions are embedded in one request and searched as one matrix, then
+    completions run BATCH_CONCURRENCY at a time. A batch takes one rate-limit
+    token per distinct on-topic question, so it can't outrun the same questions
+    sent to /ask one by one.
+    """
+    from fastapi import HTTPException
+    if not request.questions or len(request.questions) > BATCH_MAX_QUESTIONS:
+        raise HTTPException(status_code=422, detail=f"Send between 1 and {BATCH_MAX_QUESTIONS} questions")
+    with stage("filter"):
+        allowed = classify_questions(request.questions)
+    cost = len({normalize_question(question) for question, ok in zip(request.questions, allowed) if ok})
+    async with admit(http_request, "/ask/batch", request.userApiKey, cost=max(1, cost)):
+        with track_usage(key_class(request.userApiKey)) as usage:
+            answers = await _answer_batch(request.questions, allowed, request.userApiKey)
+    response = BatchAskResponse(answers=answers)
+    if request.debug:
+        response.debug = {"usage": usage.as_dict(), "stage_ms": current_timings()}
+    from fastapi import Response
+    return Response(content=response.model_dump_json(), media_type="application/json", headers=CORS_HEADERS)
+
+async def _answer_batch(questions: List[str], allowed: List[bool], user_api_key) -> List[AskResponse]:
+    import asyncio
+
+    answers = [None] * len(questions)
+    # Exact repeats, inside the batch or in the answer cache, are answered once
+    pending = {}
+    cache = await _versioned_answer_cache() if ANSWER_CACHE_ENABLED else None
+    for i, (question, ok) in enumerate(zip(questions, allowed)):
+        if not ok:
+            answers[i] = AskResponse(answer=OFF_TOPIC_ANSWER, sources=[])
+            continue
+        cached = cache.get_exact(question) if cache is not None else None
+        if cached is not None:
+            answers[i] = AskResponse(answer=cached.answer + _model_note(user_api_key), sources=cached.sources)
+            continue
+        pending.setdefault(normalize_question(question), []).append(i)
+    if not pending:
+        return answers
+
+    unique = [questions[indices[0]] for indices in pending.values()]
+    try:
+        with stage("load"):
+            qa_chain = await run_in_threadpool(get_qa_chain, user_api_key)
+        # One embeddings request and one index search for every question
+        retrieved = await qa_chain.aretrieve_batch(unique)
+    except Exception as e:
+        error = _error_response(e)
+        return [answer if answer is not None else error for answer in answers]
+
+    semaphore = asyncio.Semaphore(max(1, BATCH_CONCURRENCY))
+
+    async def answer_one(question, docs):
+        try:
+            if not docs:
+                # Nothing cleared the relevance threshold; like /ask, no model call
+                return await _finish_answer(question, NO_CONTEXT_ANSWER, docs, user_api_key)
+            async with semaphore:
+                raw_answer = await qa_chain.aanswer(question, docs)
+                return await _finish_answer(question, raw_answer, docs, user_api_key)
+        except Exception as e:
+            return _error_response(e)
+
+    results = await asyncio.gather(*[answer_one(question, docs) for question, docs in zip(unique, retrieved)])
+    for indices, result in zip(pending.values(), results):
+        for i in indices:
+            answers[i] = result
+    return answers
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def _stream_answer(request: AskRequest):
+    """Yield the answer as SSE `token` events, then a `sources` event and a `done` event.
+
+    Streaming skips the follow-up summarization call; the answer arrives as the
+    model generates it (length-budgeted by the prompt when ANSWER_MODE=concise).
+    """
+    with track_usage(key_class(request.userApiKey)):
+        async for event in _stream_events(request):
+            yield event
+
+async def _stream_events(request: AskRequest):
+    from .retrieval import build_prompt
+
+    model_note = _model_note(request.userApiKey)
+    with stage("filter"):
+        allowed = is_question_about_tc(request.question)
+    if not allowed:
+        yield _sse_event("token", {"text": OFF_TOPIC_ANSWER})
+        yield _sse_event("sources", {"sources": [], "links": ""})
+        yield _sse_event("done", {})
+        return
+
+    question_embedding = None
+    if ANSWER_CACHE_ENABLED:
+        with stage("cache"):
+            cached, question_embedding = await _lookup_cached_answer(request.question)
+        if cached is not None:
+            yield _sse_event("token", {"text": cached.answer})
+            yield _sse_event("sources", {"sources": cached.sources, "links": model_note})
+            yield _sse_event("done", {})
+            return
+
+    try:
+        with stage("load"):
+            retriever = await run_in_threadpool(_get_retriever)
+        sources = await retriever.ainvoke(request.question, query_vector=question_embedding)
+        if not sources:
+            # Nothing cleared the relevance threshold; don't spend a model call
+            yield _sse_event("token", {"text": NO_CONTEXT_ANSWER})
+            yield _sse_event("sources", {"sources": [], "links": model_note})
+            yield _sse_event("done", {})
+            return
+        llm = _create_llm(request.userApiKey or get_default_api_key(), streaming=True)
+        answer_parts = []
+        with stage("llm"):
+            async for chunk in llm.astream(build_prompt(request.question, sources)):
+                if chunk.content:
+                    answer_parts.append(chunk.content)
+                    yield _sse_event("token", {"text": chunk.content})
+
+        with stage("format"):
+            source_links = format_sources_as_links(sources)
+            source_paths = [doc.metadata.get("source", "") for doc in sources]
+        if ANSWER_CACHE_ENABLED:
+            get_answer_cache().set(request.question, "".join(answer_parts) + source_links, source_paths, question_embedding)
+        yield _sse_event("sources", {"sources": source_paths, "links": source_links + model_note})
+        yield _sse_event("done", {})
     except Exception as e:
-        # Handle API key errors gracefully
         error_msg = str(e)
         if "api" in error_msg.lower() and "key" in error_msg.lower():
-            response = AskResponse(
-                answer="There seems to be an issue with the API key provided. Please check that it's a valid OpenAI API key and try again.",
-                sources=[]
-            )
-        else:
-            response = AskResponse(
-                answer=f"I encountered an error processing your question: {error_msg}",
-                sources=[]
-            )
-    
-    # Add CORS headers for browser requests
-    from fastapi import Response
-    return Response(
-        content=response.model_dump_json(),
-        media_type="application/json",
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "POST, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type, Authorization, X-Requested-With"
-        }
+            error_msg = "There seems to be an issue with the API key provided. Please check that it's a valid OpenAI API key and try again."
+        yield _sse_event("error", {"message": error_msg})
+
+@app.options("/ask/stream")
+def ask_stream_options():
+    return ask_options()
+
+async def _release_after(events, ticket):
+    """Hold an admission slot until the stream ends or the client goes away."""
+    try:
+        async for event in events:
+            yield event
+    finally:
+        ticket.release()
+
+@app.post("/ask/stream")
+async def ask_stream_endpoint(request: AskRequest, http_request: Request):
+    """Streaming variant of /ask using Server-Sent Events.
+
+    API Gateway + Mangum buffers the whole body, so on Lambda the events arrive
+    together at the end; clients parse them the same way either way.
+    """
+    from fastapi.responses import StreamingResponse
+    from starlette.background import BackgroundTask
+    events = _stream_answer(request)
+    background = None
+    if ADMISSION_ENABLED:
+        # Admitted here so a rejection is still a 429, not an error event mid-stream
+        ticket = await get_admission().acquire(client_id(http_request, request.userApiKey), "/ask/stream")
+        events = _release_after(events, ticket)
+        # In case the body is never iterated; release() is idempotent
+        background = BackgroundTask(ticket.release)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={**CORS_HEADERS, "Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=background
     )
@@ -0,0 +1,102 @@
+"""MDX-to-plain-text extraction: frontmatter fields become metadata, markup is dropped."""
+import json
+import re
+from typing import Dict, List, Tuple
+
+# Frontmatter fields worth keeping as structured metadata
+FRONTMATTER_FIELDS = ('title', 'description', 'company', 'tags')
+
+FRONTMATTER_RE = re.compile(r'\A﻿?---[ \t]*\n(.*?)\n---[ \t]*(?:\n|\Z)', re.DOTALL)
+FENCE_RE = re.compile(r'^\s*(```|~~~)')
+IMPORT_EXPORT_RE = re.compile(
+    r'^(?:import\s(?:[^\n{]|\{[^}]*\})*?\sfrom\s+[\'"][^\'"]+[\'"]|import\s+[\'"][^\'"]+[\'"]'
+    r'|export\s+(?:default|const|let|function)\s[^\n]*);?[ \t]*$',
+    re.MULTILINE
+)
+IMAGE_RE = re.compile(r'!\[[^\]]*\]\([^)]*\)')
+JSX_COMMENT_RE = re.compile(r'\{/\*.*?\*/\}', re.DOTALL)
+# Opening, closing and self-closing JSX/HTML tags, including multi-line attribute lists
+TAG_RE = re.compile(r'</?[A-Za-z][\w.:-]*(?:\s(?:[^<>{}]|\{[^{}]*\})*)?/?>', re.DOTALL)
+BLANK_LINES_RE = re.compile(r'\n[ \t]*\n(?:[ \t]*\n)+')
+
+
+def _parse_value(value: str):
+    value = value.strip()
+    if value.startswith('['):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return [item.strip().strip('"\'') for item in value.strip('[]').split(',') if item.strip()]
+    return value.strip('"\'')
+
+
+def parse_frontmatter(content: str) -> Tuple[Dict, str]:
+    """Split YAML frontmatter from the body and return the fields in FRONTMATTER_FIELDS.
+
+    Only flat `key: value` pairs, inline lists and `- item` block lists are parsed,
+    which covers every collection schema in src/content/config.ts.
+    """
+    match = FRONTMATTER_RE.match(content)
+    if not match:
+        return {}, content
+    fields = {}
+    current_list: List[str] = None
+    for line in match.group(1).splitlines():
+        item = re.match(r'^\s+-\s+(.*)$', line)
+        if item and current_list is not None:
+            current_list.append(_parse_value(item.group(1)))
+            continue
+        current_list = None
+        pair = re.match(r'^([A-Za-z_][\w-]*):\s*(.*)$', line)
+        if not pair or pair.group(1) not in FRONTMATTER_FIELDS:
+            continue
+        key, value = pair.groups()
+        if value.strip():
+            fields[key] = _parse_value(value)
+        else:
+            fields[key] = current_list = []
+    return fields, content[match.end():]
+
+
+def _strip_markup(segment: str) -> str:
+    segment = IMPORT_EXPORT_RE.sub('', segment)
+    segment = JSX_COMMENT_RE.sub('', segment)
+    segment = IMAGE_RE.sub('', segment)
+    return TAG_RE.sub('', segment)
+
+
+def strip_mdx(body: str) -> str:
+    """Drop import/export lines, JSX/HTML tags, JSX comments and image embeds.
+
+    Text between paired tags is kept, and fenced code blocks are left untouched.
+    """
+    parts, segment, in_fence = [], [], False
+    for line in body.splitlines():
+        if FENCE_RE.match(line):
+            if in_fence:
+                parts.append("\n".join(segment + [line]))
+                segment = []
+            else:
+                parts.append(_strip_markup("\n".join(segment)))
+                segment = [line]
+            in_fence = not in_fence
+            continue
+        segment.append(line)
+    tail = "\n".join(segment)
+    parts.append(tail if in_fence else _strip_markup(tail))
+    text = "\n".join(parts)
+    return BLANK_LINES_RE.sub('\n\n', text).strip()
+
+
+def mdx_to_text(content: str) -> Tuple[str, Dict]:
+    """Plain text for embedding plus the frontmatter fields kept as metadata.
+
+    The title/description lead the text so the chunk that holds them still says
+    what the page is about once the frontmatter block is gone.
+    """
+    fields, body = parse_frontmatter(content)
+    lead = [str(fields[key]) for key in ('title', 'company', 'description') if fields.get(key)]
+    text = strip_mdx(body)
+    if lead:
+        text = "\n".join(lead) + "\n\n" + text
+    return text, fields
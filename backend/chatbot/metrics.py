@@ -0,0 +1,222 @@
+"""Per-request stage timers, Server-Timing headers and Prometheus-format metrics.
+
+Code on the request path wraps each step in `with stage("embed"):`. With
+METRICS_ENABLED=true, StageTimingMiddleware gives every HTTP request its own
+timings dict through a context variable; stages add their durations to it, the
+response carries them as a Server-Timing header, and at the end of the request
+they are observed into histograms rendered by /metrics. When disabled the
+middleware isn't installed and stage() returns a shared no-op context manager
+after one ContextVar lookup.
+
+Metrics are per process: on Lambda each container reports its own.
+"""
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+
+# Seconds; Prometheus convention
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+# Every Counter and Histogram, in /metrics output order
+REGISTRY = []
+
+
+class _NoopStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_STAGE = _NoopStage()
+
+
+class _Stage:
+    __slots__ = ("name", "timings", "start")
+
+    def __init__(self, name: str, timings: Dict[str, float]):
+        self.name = name
+        self.timings = timings
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = (time.perf_counter() - self.start) * 1000
+        # A stage that runs more than once per request accumulates
+        self.timings[self.name] = self.timings.get(self.name, 0.0) + elapsed
+        return False
+
+
+def stage(name: str):
+    """Context manager timing `name` for the current request; a no-op outside a timed request."""
+    timings = _timings.get()
+    if timings is None:
+        return _NOOP_STAGE
+    return _Stage(name, timings)
+
+
+def current_timings() -> Optional[Dict[str, float]]:
+    """Stage durations (ms) recorded so far for the current request, or None when not timing."""
+    return _timings.get()
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        return self._values.get(key, 0.0)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._values.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_number(bound)
+                labels = _format_labels(self.labelnames, key, 'le="' + le + '"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_number(series[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+
+REQUEST_SECONDS = Histogram("chatbot_request_duration_seconds", "HTTP request latency",
+                            ("route", "method", "status"))
+STAGE_SECONDS = Histogram("chatbot_stage_duration_seconds", "Time spent in each request stage",
+                          ("route", "stage"))
+
+
+def render_metrics() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def server_timing_header(timings: Dict[str, float], total_ms: float) -> str:
+    parts = [f"{name};dur={duration:.2f}" for name, duration in timings.items()]
+    parts.append(f"total;dur={total_ms:.2f}")
+    return ", ".join(parts)
+
+
+class StageTimingMiddleware:
+    """Pure ASGI middleware: times each HTTP request's stages, adds Server-Timing, records histograms.
+
+    Streaming responses send their headers before the body is generated, so
+    their Server-Timing only lists the stages finished by then; the histograms
+    get every stage.
+    """
+
+    def __init__(self, app, routes=()):
+        self.app = app
+        # Known paths label as themselves; anything else as "other", to bound label cardinality
+        self.routes = frozenset(routes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = {}
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total_ms = (time.perf_counter() - start) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing_header(timings, total_ms).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
+            route = scope["path"] if scope["path"] in self.routes else "other"
+            REQUEST_SECONDS.observe(time.perf_counter() - start, route=route, method=scope["method"],
+                                    status=status)
+            for name, duration in timings.items():
+                STAGE_SECONDS.observe(duration / 1000, route=route, stage=name)
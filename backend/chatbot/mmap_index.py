@@ -0,0 +1,113 @@
+"""Memory-mapped index format: read-only mmapped FAISS vectors plus an offset-indexed docstore.
+
+Loading the pickle format reads every vector into RAM and unpickles the whole
+LangChain docstore. This format maps a copy of the vectors read-only and stores
+the documents as one blob of JSON records with an int64 offset table, so a cold
+start only maps files and each search decodes just the documents it hits.
+Files are replaced atomically, so a process still mapping the previous version
+keeps reading it safely during a hot reload.
+"""
+import mmap
+import os
+from collections.abc import Mapping
+
+import numpy as np
+from langchain_community.docstore.base import Docstore
+from langchain_core.documents import Document
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+MMAP_VECTORS = "vectors.mmap.faiss"
+DOCSTORE_BLOB = "docstore.bin"
+DOCSTORE_OFFSETS = "docstore.offsets.npy"
+
+
+def _dumps(record: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(record)
+    return json.dumps(record, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(data) -> dict:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data))
+
+
+def has_mmap_index(index_path: str) -> bool:
+    return all(os.path.exists(os.path.join(index_path, name))
+               for name in (MMAP_VECTORS, DOCSTORE_BLOB, DOCSTORE_OFFSETS))
+
+
+def export_mmap_index(vectorstore, index_path: str):
+    """Write a LangChain FAISS vectorstore in the mmap format, documents in FAISS position order."""
+    import faiss
+
+    vectors_path = os.path.join(index_path, MMAP_VECTORS)
+    faiss.write_index(vectorstore.index, vectors_path + ".tmp")
+    blob_path = os.path.join(index_path, DOCSTORE_BLOB)
+    offsets_path = os.path.join(index_path, DOCSTORE_OFFSETS)
+    offsets = [0]
+    with open(blob_path + ".tmp", "wb") as f:
+        for position in range(vectorstore.index.ntotal):
+            doc_id = vectorstore.index_to_docstore_id[position]
+            doc = vectorstore.docstore.search(doc_id)
+            record = {"id": doc_id, "page_content": doc.page_content, "metadata": doc.metadata}
+            offsets.append(offsets[-1] + f.write(_dumps(record)))
+    with open(offsets_path + ".tmp", "wb") as f:
+        np.save(f, np.asarray(offsets, dtype=np.int64))
+    for path in (vectors_path, blob_path, offsets_path):
+        os.replace(path + ".tmp", path)
+
+
+class PositionIds(Mapping):
+    """index_to_docstore_id stand-in: FAISS position i maps to docstore key i, with no dict to build."""
+
+    def __init__(self, size: int):
+        self._size = size
+
+    def __getitem__(self, position):
+        if not 0 <= position < self._size:
+            raise KeyError(position)
+        return position
+
+    def __iter__(self):
+        return iter(range(self._size))
+
+    def __len__(self):
+        return self._size
+
+
+class MmapDocstore(Docstore):
+    """Lazy docstore that decodes one record per lookup from the mmapped blob."""
+
+    def __init__(self, index_path: str):
+        self._offsets = np.load(os.path.join(index_path, DOCSTORE_OFFSETS), mmap_mode="r")
+        self._file = open(os.path.join(index_path, DOCSTORE_BLOB), "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._blob = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def search(self, position):
+        if not 0 <= int(position) < len(self):
+            return f"ID {position} not found."
+        start, end = int(self._offsets[position]), int(self._offsets[position + 1])
+        record = _loads(self._blob[start:end])
+        return Document(id=record["id"], page_content=record["page_content"], metadata=record["metadata"])
+
+
+def load_mmap_index(index_path: str, embeddings):
+    """Load a read-only FAISS vectorstore whose vectors and documents stay on disk."""
+    import faiss
+    from langchain_community.vectorstores import FAISS
+
+    # IO_FLAG_MMAP_IFC maps flat-index codes instead of copying them (faiss >= 1.8)
+    flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+    index = faiss.read_index(os.path.join(index_path, MMAP_VECTORS), flags)
+    docstore = MmapDocstore(index_path)
+    return FAISS(embeddings, index, docstore, PositionIds(len(docstore)))
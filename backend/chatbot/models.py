@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 class QueryRequest(BaseModel):
     question: str
@@ -10,7 +10,19 @@ class QueryResponse(BaseModel):
 class AskRequest(BaseModel):
     question: str
     userApiKey: str = None  # Optional user API key
+    debug: bool = False  # Include token usage, cost and stage timings in the response
 
 class AskResponse(BaseModel):
     answer: str
-    sources: List[str]
\ No newline at end of file
+    sources: List[str]
+    confidence: Optional[str] = None  # High / Medium / Low-Medium / Low, from retrieval scores
+    debug: Optional[dict] = None  # Only when AskRequest.debug: usage per stage and stage_ms
+
+class BatchAskRequest(BaseModel):
+    questions: List[str]  # Up to BATCH_MAX_QUESTIONS, answered in this order
+    userApiKey: str = None  # Optional user API key, used for every question
+    debug: bool = False
+
+class BatchAskResponse(BaseModel):
+    answers: List[AskResponse]  # One per question, in input order
+    debug: Optional[dict] = None
@@ -0,0 +1,70 @@
+"""RetrievalQA that skips the LLM when retrieval finds nothing relevant."""
+from typing import Any, Dict, List, Optional
+
+from langchain.chains import RetrievalQA
+from langchain_core.callbacks import AsyncCallbackManagerForChainRun, CallbackManagerForChainRun
+from langchain_core.documents import Document
+
+from .metrics import stage
+from .prompts import NO_CONTEXT_ANSWER
+
+
+class GroundedRetrievalQA(RetrievalQA):
+    """RetrievalQA whose answer is NO_CONTEXT_ANSWER, with no model call, when no document is retrieved.
+
+    The retriever enforces the relevance threshold, so an empty result means no
+    chunk cleared it and the model could only say it doesn't know. An optional
+    "query_vector" input is handed to the retriever so it doesn't embed the
+    question again.
+    """
+
+    def _get_docs(self, question: str, *, run_manager: CallbackManagerForChainRun,
+                  query_vector=None) -> List[Document]:
+        return self.retriever.invoke(question, config={"callbacks": run_manager.get_child()},
+                                     query_vector=query_vector)
+
+    async def _aget_docs(self, question: str, *, run_manager: AsyncCallbackManagerForChainRun,
+                         query_vector=None) -> List[Document]:
+        return await self.retriever.ainvoke(question, config={"callbacks": run_manager.get_child()},
+                                            query_vector=query_vector)
+
+    def _result(self, answer: str, docs) -> Dict[str, Any]:
+        if self.return_source_documents:
+            return {self.output_key: answer, "source_documents": docs}
+        return {self.output_key: answer}
+
+    def _call(self, inputs: Dict[str, Any],
+              run_manager: Optional[CallbackManagerForChainRun] = None) -> Dict[str, Any]:
+        _run_manager = run_manager or CallbackManagerForChainRun.get_noop_manager()
+        question = inputs[self.input_key]
+        docs = self._get_docs(question, run_manager=_run_manager, query_vector=inputs.get("query_vector"))
+        if not docs:
+            return self._result(NO_CONTEXT_ANSWER, [])
+        combine = self.combine_documents_chain
+        with stage("llm"):
+            answer = combine.invoke({"input_documents": docs, "question": question},
+                                    config={"callbacks": _run_manager.get_child()})[combine.output_key]
+        return self._result(answer, docs)
+
+    async def _acall(self, inputs: Dict[str, Any],
+                     run_manager: Optional[AsyncCallbackManagerForChainRun] = None) -> Dict[str, Any]:
+        _run_manager = run_manager or AsyncCallbackManagerForChainRun.get_noop_manager()
+        question = inputs[self.input_key]
+        docs = await self._aget_docs(question, run_manager=_run_manager, query_vector=inputs.get("query_vector"))
+        if not docs:
+            return self._result(NO_CONTEXT_ANSWER, [])
+        combine = self.combine_documents_chain
+        with stage("llm"):
+            answer = (await combine.ainvoke({"input_documents": docs, "question": question},
+                                            config={"callbacks": _run_manager.get_child()}))[combine.output_key]
+        return self._result(answer, docs)
+
+    async def aretrieve_batch(self, questions: List[str]) -> List[List[Document]]:
+        """Retrieval for many questions at once (HybridRetriever.aretrieve_batch)."""
+        return await self.retriever.aretrieve_batch(questions)
+
+    async def aanswer(self, question: str, docs: List[Document]) -> str:
+        """The combine chain's answer for already retrieved documents."""
+        combine = self.combine_documents_chain
+        with stage("llm"):
+            return (await combine.ainvoke({"input_documents": docs, "question": question}))[combine.output_key]
@@ -0,0 +1,119 @@
+"""Scalar-quantized index format: compact in-memory codes, exact re-rank against mmapped vectors.
+
+A rebuild with INDEX_QUANTIZATION=fp16 or int8 writes the index vectors as a
+faiss IndexScalarQuantizer (2 or 1 byte per dimension instead of 4). With
+INDEX_FORMAT=quantized the codes are loaded into memory and wrapped in an
+IndexRefine over the read-only mmapped float32 copy from mmap_index.py: the
+codes pick k * QUANTIZED_RERANK_FACTOR candidates, and only those rows of the
+full vectors are read to compute exact distances. Documents come from the
+mmapped docstore, so nothing is unpickled.
+
+Every rebuild deletes the quantized files it didn't write and records the kind
+and vector count in manifest.json; codes whose count doesn't match the mmapped
+vectors are never loaded.
+
+Product quantization is deliberately not offered: PQ trains 256-centroid
+codebooks per sub-vector and needs thousands of training vectors to beat
+int8 on recall, while the blog corpus is a few hundred chunks.
+"""
+import os
+from typing import Optional
+
+from .index_manifest import IndexManifest
+from .mmap_index import MMAP_VECTORS, MmapDocstore, PositionIds, has_mmap_index
+
+# Written by rebuilds: "none", "fp16" or "int8"
+INDEX_QUANTIZATION = os.getenv("INDEX_QUANTIZATION", "none")
+# Candidates re-ranked exactly per requested hit
+QUANTIZED_RERANK_FACTOR = int(os.getenv("QUANTIZED_RERANK_FACTOR", "4"))
+
+QUANTIZED_VECTORS = {"int8": "vectors.sq8.faiss", "fp16": "vectors.fp16.faiss"}
+_QUANTIZER_TYPES = {"int8": "QT_8bit", "fp16": "QT_fp16"}
+
+
+def quantize_index(index, kind: str):
+    """Scalar-quantized copy of a flat faiss index."""
+    import faiss
+
+    vectors = index.reconstruct_n(0, index.ntotal)
+    quantized = faiss.IndexScalarQuantizer(index.d, getattr(faiss.ScalarQuantizer, _QUANTIZER_TYPES[kind]),
+                                           faiss.METRIC_L2)
+    quantized.train(vectors)
+    quantized.add(vectors)
+    return quantized
+
+
+def export_quantized_index(vectorstore, index_path: str, kind: str = INDEX_QUANTIZATION) -> Optional[dict]:
+    """Write the quantized codes next to the mmap export and remove any other kind's.
+
+    Returns the manifest record {"kind", "ntotal"}, or None when kind is "none".
+    """
+    import faiss
+
+    if kind != "none" and kind not in QUANTIZED_VECTORS:
+        raise ValueError(f"INDEX_QUANTIZATION must be none, fp16 or int8, not {kind!r}")
+    # Codes from an earlier rebuild no longer match the vectors
+    for other, name in QUANTIZED_VECTORS.items():
+        if other != kind and os.path.exists(os.path.join(index_path, name)):
+            os.remove(os.path.join(index_path, name))
+    if kind == "none":
+        return None
+    path = os.path.join(index_path, QUANTIZED_VECTORS[kind])
+    faiss.write_index(quantize_index(vectorstore.index, kind), path + ".tmp")
+    os.replace(path + ".tmp", path)
+    return {"kind": kind, "ntotal": vectorstore.index.ntotal}
+
+
+def find_quantized_vectors(index_path: str):
+    """Path of the quantized copy the manifest records, or None.
+
+    Indexes from before the manifest recorded it fall back to the smallest copy
+    present; load_quantized_index still checks its vector count.
+    """
+    if not has_mmap_index(index_path):
+        return None
+    record = IndexManifest.load(index_path).quantized
+    kinds = [record["kind"]] if record else ["int8", "fp16"]
+    for kind in kinds:
+        path = os.path.join(index_path, QUANTIZED_VECTORS[kind])
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def refine_index(quantized, full_vectors, k_factor: int = QUANTIZED_RERANK_FACTOR):
+    """Search `quantized`, then re-rank k * k_factor candidates exactly against `full_vectors`."""
+    import faiss
+
+    index = faiss.IndexRefine(quantized, full_vectors)
+    index.k_factor = k_factor
+    # The SWIG wrapper does not own its sub-indexes; keep them alive with it
+    index.referenced_objects = [quantized, full_vectors]
+    return index
+
+
+def is_quantized(index) -> bool:
+    return hasattr(index, "base_index") and hasattr(index, "refine_index")
+
+
+def load_quantized_index(index_path: str, embeddings):
+    """Load a read-only FAISS vectorstore with quantized codes in memory and everything else mapped.
+
+    Returns None when the codes, vectors and documents don't all hold the same
+    number of rows (e.g. codes left over from an earlier rebuild).
+    """
+    import faiss
+    from langchain_community.vectorstores import FAISS
+
+    quantized = faiss.read_index(find_quantized_vectors(index_path))
+    flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+    full_vectors = faiss.read_index(os.path.join(index_path, MMAP_VECTORS), flags)
+    docstore = MmapDocstore(index_path)
+    record = IndexManifest.load(index_path).quantized
+    counts = {quantized.ntotal, full_vectors.ntotal, len(docstore)}
+    if record:
+        counts.add(record["ntotal"])
+    if len(counts) != 1:
+        print(f"Quantized index doesn't match the vectors (row counts {sorted(counts)}), not using it")
+        return None
+    return FAISS(embeddings, refine_index(quantized, full_vectors), docstore, PositionIds(len(docstore)))
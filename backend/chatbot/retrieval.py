@@ -0,0 +1,34 @@
+"""Retrieval and prompt assembly helpers shared by the /ask code paths."""
+import os
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+from .prompts import prompt_template
+
+# "langchain" keeps the RetrievalQA chain, "numpy" serves /ask with lean_qa.LeanQA
+RETRIEVAL_ENGINE = os.getenv("RETRIEVAL_ENGINE", "langchain")
+RETRIEVAL_K = 5
+# Minimum cosine similarity for a vector hit; 0.75 is the old FAISS L2 threshold of 0.5 on unit vectors
+RELEVANCE_THRESHOLD = float(os.getenv("RELEVANCE_THRESHOLD", "0.75"))
+
+
+def format_context(docs: List["Document"]) -> str:
+    """Join documents the same way the "stuff" RetrievalQA chain does."""
+    return "\n\n".join(doc.page_content for doc in docs)
+
+
+def with_relevance(doc: "Document", relevance: Optional[float]) -> "Document":
+    """Copy of a docstore document carrying its retrieval score in metadata["relevance_score"].
+
+    Keyword fast-path hits have no vector score and are returned unchanged.
+    """
+    if relevance is None:
+        return doc
+    return doc.model_copy(update={"metadata": {**doc.metadata, "relevance_score": round(relevance, 4)}})
+
+
+def build_prompt(question: str, docs: List["Document"]) -> str:
+    return prompt_template.format(context=format_context(docs), question=question)
+
@@ -1,19 +1,24 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from .admission import admit
 from .models import QueryRequest, QueryResponse
-from .services import query_vectorstore
 
 # Create a router
 router = APIRouter()
 
 # Chatbot query endpoint
 @router.post("/chat", response_model=QueryResponse, tags=["Chatbot"])
-async def chat(request: QueryRequest):
+async def chat(request: QueryRequest, http_request: Request):
+    # services pulls in LangChain and FAISS; import on first use to keep cold starts light
+    from .services import aquery_vectorstore
     question = request.question
-    try:
-        answer, sources = query_vectorstore(question)
-        return {"answer": answer, "sources": [source.metadata["source"] for source in sources]}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # Rate limited per source IP; a rejection is a 429 (see admission.py), not a 500
+    async with admit(http_request, "/chat"):
+        try:
+            # load, embed, search, pack and llm stages are timed inside (see metrics.py)
+            answer, sources = await aquery_vectorstore(question)
+            return {"answer": answer, "sources": [source.metadata["source"] for source in sources]}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 # Health check endpoint
 @router.get("/health", tags=["Health"])
@@ -1,13 +1,28 @@
 # Normal imports - no more lazy loading needed with container images
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_community.vectorstores import FAISS
-from langchain.chains import RetrievalQA
 from langchain_core.prompts import PromptTemplate
 
 from dotenv import load_dotenv
+import datetime
 import os
+import uuid
 
 from . import content_ingest
+from .prompts import ANSWER_MAX_TOKENS, prompt_template
+from .qa_chain import GroundedRetrievalQA
+from .answer_cache import get_answer_cache
+from .embedding_cache import CachedEmbeddings
+from .embedding_pipeline import embed_texts
+from .http_clients import openai_client_kwargs
+from .bm25 import BM25Index
+from .hybrid_retriever import HybridRetriever
+from .index_manager import get_index_manager
+from .mmap_index import export_mmap_index
+from .quantized_index import export_quantized_index
+from .index_manifest import IndexManifest, source_key
+from .metrics import stage
+from .usage_callback import UsageCallback
 
 load_dotenv()
 openai_key = os.environ.get("OPENAI_API_KEY")
@@ -17,107 +32,137 @@ chatbot_dir = os.path.dirname(__file__)
 faiss_index_path = os.path.join(chatbot_dir, "faiss_index")
 blog_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src/content'))
 
-prompt_template = """
-You are TC Heiner, a senior software engineer and technical architect, having a professional conversation about your documented experience and projects.
 
-BETA NOTICE: Start your response with a brief note that this chatbot is in beta testing, then proceed with your answer.
-
-STRICT ACCURACY RULES:
-- Only use information explicitly provided in the context
-- Never invent experiences, projects, or technical details
-- If context is insufficient, clearly state "I don't have that specific information documented"
-- When explaining technical decisions, only reference what's documented in the context
-
-RESPONSE STYLE:
-- Answer in first person as TC
-- Be conversational but precise
-- Provide specific examples from the context when available
-- Explain technical reasoning based on documented decisions
-- Include links when referencing blog posts: "You can read more about this in my post: [Title](https://tcheiner.com/posts/slug)"
-
-DOCUMENTED BACKGROUND:
-Your experience includes 17+ years in software engineering, progression from developer to staff engineer at Wells Fargo, and recent roles as Founding Engineer at ManaBurn and Cloud Architect at Myndsens. Documented expertise areas include Python, Java, AWS, AI/ML technologies, containerization, and technical leadership.
-
-Context: {context}
-Question: {question}
-
-Answer: """
 def rebuild_vectorstore():
     """
-    Rebuilds the FAISS vectorstore from new/updated documents.
+    Incrementally updates the FAISS vectorstore from new, updated and deleted documents.
+
+    Vectors for changed files are replaced and vectors for deleted files are removed,
+    using the source-path -> vector-id manifest stored next to the index.
     """
-    documents = content_ingest.load_documents_for_embedding()
-    embeddings = OpenAIEmbeddings(openai_api_key=openai_key)
-    if documents:
-        print(f"Embedding {len(documents)} new/updated documents...")
-        if not os.path.exists(os.path.join(faiss_index_path, "index.faiss")):
-            # Create new FAISS index
-            vectorstore = FAISS.from_documents(documents, embeddings)
-        else:
-            # Load existing index and add new docs
-            vectorstore = FAISS.load_local(faiss_index_path, embeddings, allow_dangerous_deserialization=True)
-            vectorstore.add_documents(documents)
-        # Save updated index
-        vectorstore.save_local(faiss_index_path)
-        # Update the last rebuild time
-        content_ingest.update_last_rebuild_time()
-        return vectorstore
-    else:
-        print("No new or updated documents to embed.")
-        # Load the existing index
+    # Only text that has never been embedded with this model hits the API;
+    # retries are handled by the embedding pipeline's rate-limit backoff
+    embeddings = CachedEmbeddings(OpenAIEmbeddings(openai_api_key=openai_key, max_retries=0))
+    if os.path.exists(os.path.join(faiss_index_path, "index.faiss")):
         vectorstore = FAISS.load_local(faiss_index_path, embeddings, allow_dangerous_deserialization=True)
+        manifest = IndexManifest.load(faiss_index_path, vectorstore)
+        documents = content_ingest.load_documents_for_embedding()
+    else:
+        # No index yet - embed everything regardless of the last rebuild time
+        vectorstore = None
+        manifest = IndexManifest()
+        documents = content_ingest.load_documents_for_embedding(since=datetime.datetime.fromtimestamp(0))
+
+    # Drop vectors for files that changed (they are re-added below) or no longer exist
+    live_sources = {source_key(file['path']) for file in content_ingest.list_content_files()}
+    changed_sources = {source_key(doc.metadata['source']) for doc in documents}
+    stale_ids = []
+    for key in list(manifest.sources):
+        if key not in live_sources or key in changed_sources:
+            stale_ids.extend(manifest.remove(key))
+
+    if not documents and not stale_ids:
+        print("No new, updated or deleted documents.")
         return vectorstore
 
+    ids = [str(uuid.uuid4()) for _ in documents]
+    for doc, doc_id in zip(documents, ids):
+        manifest.add(source_key(doc.metadata['source']), [doc_id])
+
+    print(f"Embedding {len(documents)} new/updated documents, removing {len(stale_ids)} stale vectors...")
+    texts = [doc.page_content for doc in documents]
+    metadatas = [doc.metadata for doc in documents]
+    vectors = embed_texts(texts, embeddings)
+    if vectorstore is None:
+        # Create new FAISS index
+        vectorstore = FAISS.from_embeddings(list(zip(texts, vectors)), embeddings, metadatas=metadatas, ids=ids)
+    else:
+        if stale_ids:
+            vectorstore.delete(stale_ids)
+        if documents:
+            vectorstore.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas, ids=ids)
+    # Save updated index and its manifest
+    vectorstore.save_local(faiss_index_path)
+    export_mmap_index(vectorstore, faiss_index_path)
+    manifest.quantized = export_quantized_index(vectorstore, faiss_index_path)
+    BM25Index.from_vectorstore(vectorstore).save(faiss_index_path)
+    manifest.version += 1
+    manifest.save(faiss_index_path)
+    print(f"Embedding cache: {embeddings.hits} hits, {embeddings.misses} misses")
+    print(f"Index now holds {manifest.vector_count()} vectors from {len(manifest.sources)} sources")
+    # Update the last rebuild time
+    content_ingest.update_last_rebuild_time()
+    # Cached answers were built against the old index
+    get_answer_cache().invalidate()
+    return vectorstore
+
 def get_local_vectorstore():
     """
     Loads the local FAISS vectorstore from disk.
     """
-    embeddings = OpenAIEmbeddings(openai_api_key=openai_key)
+    embeddings = OpenAIEmbeddings(openai_api_key=openai_key, **openai_client_kwargs())
     return FAISS.load_local(faiss_index_path, embeddings, allow_dangerous_deserialization=True)
 
 def get_lambda_vectorstore():
     LAYER_PATH = "/opt/python/faiss_index"  # /opt is where Lambda layers are mounted
     faiss_index_path = LAYER_PATH
     openai_key = os.environ.get("OPENAI_API_KEY")
-    embeddings = OpenAIEmbeddings(openai_api_key=openai_key)
+    embeddings = OpenAIEmbeddings(openai_api_key=openai_key, **openai_client_kwargs())
     return FAISS.load_local(faiss_index_path, embeddings, allow_dangerous_deserialization=True)
 
-def get_qa_chain(vectorstore):
+def get_qa_chain(vectorstore, bm25=None):
     PROMPT = PromptTemplate(template=prompt_template, input_variables=["context", "question"])
-    return RetrievalQA.from_chain_type(
+    return GroundedRetrievalQA.from_chain_type(
         llm=ChatOpenAI(
             model="gpt-4o-mini",      # Better model for higher quality responses
             temperature=0.2,          # Low temperature for accuracy with slight personality
-            max_tokens=400,           # Longer responses for comprehensive answers
-            openai_api_key=openai_key
-        ),
-        retriever=vectorstore.as_retriever(
-            search_type="similarity",
-            search_kwargs={
-                "k": 5,               # More context documents for better answers
-                "score_threshold": 0.5  # Flexible similarity matching
-            }
+            max_tokens=ANSWER_MAX_TOKENS,  # Longer responses unless ANSWER_MODE=concise
+            openai_api_key=openai_key,
+            callbacks=[UsageCallback("llm", "gpt-4o-mini")],  # Token and cost accounting
+            **openai_client_kwargs()  # Shared keep-alive connection pool
         ),
+        retriever=HybridRetriever(
+            vectorstore=vectorstore,
+            bm25=bm25,                # Keyword ranking fused with vector hits
+            k=5                       # More context documents for better answers
+        ),                            # Chunks below RELEVANCE_THRESHOLD never reach the LLM
         return_source_documents=True,
         chain_type_kwargs={"prompt": PROMPT}
     )
 
+_chat_chain = None
+
+def get_shared_qa_chain():
+    """
+    QA chain over the process-wide index shared with /ask; rebuilt when the index is swapped.
+    """
+    global _chat_chain
+    snapshot = get_index_manager().snapshot()
+    if _chat_chain is None or _chat_chain[0] is not snapshot.vectorstore:
+        _chat_chain = (snapshot.vectorstore, get_qa_chain(snapshot.vectorstore, snapshot.bm25))
+    return _chat_chain[1]
+
 def query_vectorstore(question):
     """
     Queries the vectorstore with the given question and returns the answer and sources.
     """
-    # Check if running in Lambda environment
-    if os.path.exists("/opt/python/faiss_index"):
-        vectorstore = get_lambda_vectorstore()
-    else:
-        vectorstore = get_local_vectorstore()
-    
-    qa_chain = get_qa_chain(vectorstore)
+    qa_chain = get_shared_qa_chain()
     response = qa_chain.invoke({"query": question})
     answer = response["result"]
     sources = response["source_documents"]
     return answer, sources
 
+async def aquery_vectorstore(question):
+    """
+    Async variant of query_vectorstore; the first index load stays off the event loop.
+    """
+    from starlette.concurrency import run_in_threadpool
+
+    with stage("load"):
+        qa_chain = await run_in_threadpool(get_shared_qa_chain)
+    response = await qa_chain.ainvoke({"query": question})
+    return response["result"], response["source_documents"]
+
 def get_mock_response(question: str) -> str:
     """
     Mock response generator for chatbot queries.
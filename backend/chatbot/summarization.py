@@ -1,31 +1,104 @@
 """Response summarization focused on skills and leadership."""
-from langchain_openai import ChatOpenAI
+import hashlib
+import os
 
-def summarize_response(response_text: str, openai_key: str) -> str:
-    """Summarize response focusing on skills, critical thinking, and leadership without adding information."""
-    try:
+from .cache import LRUCache
+from .http_clients import openai_client_kwargs
+from .prompts import ANSWER_MODE, ANSWER_TOKEN_BUDGET
+
+# Answers longer than this many tokens are summarized in ANSWER_MODE=summarize
+SUMMARIZE_MIN_TOKENS = int(os.getenv("SUMMARIZE_MIN_TOKENS", "150"))
+SUMMARY_CACHE_SIZE = int(os.getenv("SUMMARY_CACHE_SIZE", "256"))
+
+# Summarizer clients keyed by a hash of the API key, never the raw key
+_clients = LRUCache(maxsize=32, ttl=3600)
+# Summaries keyed by a hash of the answer; the summary doesn't depend on whose key made it
+_summaries = LRUCache(maxsize=SUMMARY_CACHE_SIZE, ttl=86400)
+
+
+def needs_summary(answer: str) -> bool:
+    """Whether an answer is long enough to be worth a summarization call.
+
+    Concise answers were already budgeted by the prompt; they are only
+    summarized if the model overshot the budget by more than half.
+    """
+    from .chunking import count_tokens
+
+    limit = ANSWER_TOKEN_BUDGET * 3 // 2 if ANSWER_MODE == "concise" else SUMMARIZE_MIN_TOKENS
+    return count_tokens(answer) > limit
+
+
+def _answer_key(response_text: str) -> str:
+    return hashlib.sha256(response_text.encode("utf-8")).hexdigest()
+
+
+def summary_cache_stats() -> dict:
+    return _summaries.stats()
+
+
+def _summarization_client(openai_key: str):
+    from langchain_openai import ChatOpenAI
+    from .usage_callback import UsageCallback
+
+    key = hashlib.sha256(openai_key.encode("utf-8")).hexdigest()
+    client = _clients.get(key)
+    if client is None:
         client = ChatOpenAI(
             model="gpt-4o-mini",
             temperature=0.1,  # Low temperature to avoid making things up
             max_tokens=200,
-            openai_api_key=openai_key
+            openai_api_key=openai_key,
+            callbacks=[UsageCallback("summarize", "gpt-4o-mini")],  # Token and cost accounting
+            **openai_client_kwargs()  # Reuse pooled keep-alive connections
         )
-        
-        summarization_prompt = f"""Summarize the following response to be more concise, focusing specifically on:
+        _clients.set(key, client)
+    return client
+
+
+def _summarization_prompt(response_text: str) -> str:
+    return f"""Summarize the following response to be more concise, focusing specifically on:
 - Hard technical skills (languages, frameworks, tools, technologies)
 - Soft skills (communication, collaboration, problem-solving)
 - Critical thinking and decision-making examples
 - Leadership and mentoring experiences
 
-Keep it to 150-180 tokens. Stay in first person as TC Heiner. Only use information that is explicitly stated - do not add or infer anything not mentioned:
+Keep it to {ANSWER_TOKEN_BUDGET - 30}-{ANSWER_TOKEN_BUDGET} tokens. Stay in first person as TC Heiner. Only use information that is explicitly stated - do not add or infer anything not mentioned:
 
 {response_text}
 
 Skills-focused summary:"""
-        
-        summary = client.invoke([{"role": "user", "content": summarization_prompt}])
-        return summary.content.strip()
+
+
+def summarize_response(response_text: str, openai_key: str) -> str:
+    """Summarize response focusing on skills, critical thinking, and leadership without adding information."""
+    key = _answer_key(response_text)
+    cached = _summaries.get(key)
+    if cached is not None:
+        return cached
+    try:
+        client = _summarization_client(openai_key)
+        summary = client.invoke([{"role": "user", "content": _summarization_prompt(response_text)}])
+        text = summary.content.strip()
+        _summaries.set(key, text)
+        return text
     except Exception as e:
         print(f"Summarization failed: {e}")
         # Fallback: return original response if summarization fails
-        return response_text
\ No newline at end of file
+        return response_text
+
+
+async def asummarize_response(response_text: str, openai_key: str) -> str:
+    """Async variant of summarize_response for the async request path."""
+    key = _answer_key(response_text)
+    cached = _summaries.get(key)
+    if cached is not None:
+        return cached
+    try:
+        client = _summarization_client(openai_key)
+        summary = await client.ainvoke([{"role": "user", "content": _summarization_prompt(response_text)}])
+        text = summary.content.strip()
+        _summaries.set(key, text)
+        return text
+    except Exception as e:
+        print(f"Summarization failed: {e}")
+        return response_text
@@ -0,0 +1,123 @@
+"""OpenAI token usage and cost, attributed to pipeline stage and API key class.
+
+Every embedding and completion call reports its tokens through record_usage():
+counters for /metrics always, plus the ledger of the current request when an
+endpoint opened one with track_usage(). Key class is "free" for the
+OPENAI_API_KEY tier and "user" for AskRequest.userApiKey traffic.
+
+Completions report the usage OpenAI returns (usage_callback.UsageCallback for
+LangChain models, record_completion() for the SDK). LangChain's embeddings drop the usage
+field, so query embeddings are counted with tiktoken instead, which is exact
+for the cl100k models.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from .metrics import Counter
+
+# USD per million tokens (input, output), from OpenAI's pricing page
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "text-embedding-ada-002": (0.10, 0.0),
+    "text-embedding-3-small": (0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.0),
+}
+
+TOKENS = Counter("chatbot_openai_tokens_total", "OpenAI tokens by stage, key class, model and kind",
+                 ("stage", "key_class", "model", "kind"))
+COST = Counter("chatbot_openai_cost_usd_total", "Estimated OpenAI spend in USD by stage and key class",
+               ("stage", "key_class"))
+
+
+def _price(model: str):
+    # Dated snapshots ("gpt-4o-mini-2024-07-18") bill as their base model
+    for name, price in MODEL_PRICES.items():
+        if model == name or model.startswith(name + "-"):
+            return price
+    return (0.0, 0.0)
+
+
+def cost_usd(model: str, prompt_tokens: int, completion_tokens: int = 0) -> float:
+    input_price, output_price = _price(model)
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+class RequestUsage:
+    """Tokens and cost of one request, per stage."""
+
+    def __init__(self, key_class: str):
+        self.key_class = key_class
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    def add(self, stage: str, prompt_tokens: int, completion_tokens: int, cost: float):
+        entry = self.stages.setdefault(stage, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                                               "cost_usd": 0.0})
+        entry["calls"] += 1
+        entry["prompt_tokens"] += prompt_tokens
+        entry["completion_tokens"] += completion_tokens
+        entry["cost_usd"] += cost
+
+    def calls(self) -> int:
+        return sum(entry["calls"] for entry in self.stages.values())
+
+    def as_dict(self) -> dict:
+        stages = {name: {**entry, "cost_usd": round(entry["cost_usd"], 8)} for name, entry in self.stages.items()}
+        return {
+            "key_class": self.key_class,
+            "stages": stages,
+            "calls": self.calls(),
+            "prompt_tokens": sum(entry["prompt_tokens"] for entry in self.stages.values()),
+            "completion_tokens": sum(entry["completion_tokens"] for entry in self.stages.values()),
+            "cost_usd": round(sum(entry["cost_usd"] for entry in self.stages.values()), 8),
+        }
+
+
+_usage: ContextVar[Optional[RequestUsage]] = ContextVar("request_usage", default=None)
+
+
+def key_class(user_api_key: Optional[str]) -> str:
+    return "user" if user_api_key else "free"
+
+
+@contextmanager
+def track_usage(key_class: str):
+    """Collect the usage of everything called inside into a RequestUsage."""
+    usage = RequestUsage(key_class)
+    token = _usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage.reset(token)
+
+
+def record_usage(stage: str, model: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+                 key_class: Optional[str] = None):
+    """Count one OpenAI call's tokens; key_class defaults to the current request's."""
+    usage = _usage.get()
+    if key_class is None:
+        key_class = usage.key_class if usage is not None else "free"
+    cost = cost_usd(model, prompt_tokens, completion_tokens)
+    if prompt_tokens:
+        TOKENS.inc(prompt_tokens, stage=stage, key_class=key_class, model=model, kind="prompt")
+    if completion_tokens:
+        TOKENS.inc(completion_tokens, stage=stage, key_class=key_class, model=model, kind="completion")
+    COST.inc(cost, stage=stage, key_class=key_class)
+    if usage is not None:
+        usage.add(stage, prompt_tokens, completion_tokens, cost)
+
+
+def record_embedding(stage: str, embeddings, texts, key_class: Optional[str] = None):
+    """Count a LangChain embeddings call, which doesn't return usage, by tokenizing its input."""
+    from .chunking import count_tokens
+    record_usage(stage, getattr(embeddings, "model", "unknown"),
+                 prompt_tokens=sum(count_tokens(text) for text in texts), key_class=key_class)
+
+
+def record_completion(stage: str, completion):
+    """Count an openai SDK chat completion or embeddings response from its usage field."""
+    usage = getattr(completion, "usage", None)
+    if usage is None:
+        return
+    record_usage(stage, completion.model, prompt_tokens=usage.prompt_tokens or 0,
+                 completion_tokens=getattr(usage, "completion_tokens", 0) or 0)
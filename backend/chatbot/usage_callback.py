@@ -0,0 +1,29 @@
+"""LangChain callback reporting chat model token usage to usage.record_usage."""
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .usage import record_usage
+
+
+class UsageCallback(BaseCallbackHandler):
+    """Records the token usage of every call a LangChain chat model makes, under one stage."""
+
+    # Run in the caller's context, so the request's ledger is visible
+    run_inline = True
+
+    def __init__(self, stage: str, model: str):
+        self.stage = stage
+        self.model = model
+
+    def on_llm_end(self, response, **kwargs):
+        prompt_tokens = completion_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                prompt_tokens += metadata.get("input_tokens", 0)
+                completion_tokens += metadata.get("output_tokens", 0)
+        if not prompt_tokens and not completion_tokens:
+            token_usage = (response.llm_output or {}).get("token_usage") or {}
+            prompt_tokens = token_usage.get("prompt_tokens", 0)
+            completion_tokens = token_usage.get("completion_tokens", 0)
+        model = (response.llm_output or {}).get("model_name") or self.model
+        record_usage(self.stage, model, prompt_tokens, completion_tokens)
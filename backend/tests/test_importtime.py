@@ -0,0 +1,14 @@
+"""The Lambda handler module must import within IMPORT_BUDGET_MS and without the heavy packages."""
+from chatbot.importtime import HANDLER_MODULE, IMPORT_BUDGET_MS, heavy_imports, profile_import, total_ms
+
+
+def test_handler_import_within_budget():
+    # Fastest of three fresh interpreters, so one slow run on a busy CI host doesn't fail the build
+    timings = profile_import(HANDLER_MODULE, repeat=3)
+    total = total_ms(timings, HANDLER_MODULE)
+    assert total <= IMPORT_BUDGET_MS, f"{HANDLER_MODULE} imports in {total:.1f} ms, budget {IMPORT_BUDGET_MS:.0f} ms"
+
+
+def test_handler_import_defers_heavy_packages():
+    eager = heavy_imports(profile_import(HANDLER_MODULE))
+    assert not eager, f"{HANDLER_MODULE} imports {', '.join(eager)} eagerly; import them on first use"
@@ -0,0 +1,39 @@
+"""The compiled question filter must decide exactly like the original per-pattern filter."""
+import pytest
+
+from benchmarks.question_filter import generated_questions, legacy_is_question_about_tc
+from chatbot.filters import classify_questions, is_question_about_tc
+
+EDGE_CASES = [
+    "", " ", "?", "Tell me about TC", "Who is Heiner?", "What is your experience with AWS?",
+    "What's the weather today?", "Tell me a joke about your work", "What is 2+2?", "what is your 2 cents",
+    "Calculate 15 * 3", "solve 2x = 4 for your team", "Can you write some code for me?",
+    "Write Python code for your project", "create a function that sorts", "Generate a script for work",
+    "generate a script", "generate a script for TC", "How do you handle conflict?", "Describe a time you led",
+    "problem-solving approach", "problem_solving", "decision making at ManaBurn", "stock price of AAPL",
+    "storytelling", "history of Wells Fargo", "newsletter", "Recipes?", "weatherproof", "TC's résumé",
+    "Kubernetes", "ManaBurn", "Myndsens", "Python", "creative direction", "creativity", "recreate the function",
+    "rewrite the code", "somewhat is 5", "WHAT IS 5", "ſtock options at your job", "the ıdea of ai", "AI",
+    "Tell Me About A Time you failed", "you", "youth", "yours", "cv", "cvs", "data-driven", "fit", "fitness",
+    "İstanbul AI conference", "ﬁt", "work\nstyle", "tell  me about", "What do you do?", "how would you test it",
+]
+
+
+def check_equivalence(questions) -> list:
+    """(question, legacy, compiled, batch) for every question the three filters disagree on."""
+    batch = classify_questions(questions)
+    return [(question, legacy, new, batched)
+            for question, batched in zip(questions, batch)
+            for legacy, new in [(legacy_is_question_about_tc(question), is_question_about_tc(question))]
+            if not legacy == new == batched]
+
+
+@pytest.mark.parametrize("question", EDGE_CASES)
+def test_edge_case_matches_legacy_filter(question):
+    assert check_equivalence([question]) == []
+
+
+def test_generated_questions_match_legacy_filter():
+    questions = list(generated_questions(50000))
+    mismatches = check_equivalence(questions)
+    assert mismatches == [], f"{len(mismatches)} mismatches, e.g. {mismatches[:5]}"